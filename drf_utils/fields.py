@@ -1,12 +1,62 @@
 import base64
+import binascii
+import datetime
 import mimetypes
 import uuid
-from typing import Optional, cast
+from functools import lru_cache
+from typing import Optional, Union
 
-import six
+from django.conf import settings
 from django.core.files.base import ContentFile
-from rest_framework import serializers
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from rest_framework import ISO_8601, serializers
 from rest_framework.fields import SkipField, empty
+from rest_framework.settings import api_settings
+
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+_DATA_URI_PREFIX = "data:"
+_BASE64_SEPARATOR = ";base64,"
+_DATA_URI_PREFIX_BYTES = _DATA_URI_PREFIX.encode("ascii")
+_BASE64_SEPARATOR_BYTES = _BASE64_SEPARATOR.encode("ascii")
+
+# Maximum length of the "data:<mime type>;base64," header of a data URI
+_HEADER_MAX_LENGTH = 256
+
+# Number of base64 characters decoded at a time when streaming large payloads
+# to disk. Must be a multiple of 4 so that chunks decode independently.
+_DECODE_CHUNK_SIZE = 1 << 20
+
+# Extensions of the most common uploaded MIME types, resolved without
+# loading the mimetypes database
+_COMMON_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/heic": ".heic",
+    "application/pdf": ".pdf",
+}
+
+
+def _b64decode(data):
+    """Decodes base64 data with pybase64 (SIMD accelerated) if available, falling back to the standard library."""
+    if pybase64 is not None:
+        return pybase64.b64decode(data, validate=False)
+    return base64.b64decode(data)
+
+
+@lru_cache(maxsize=128)
+def _get_extension_for_mime_type(mime_type: "str") -> "str":
+    """Returns the file extension for the given MIME type, or ".bin" if it is unknown."""
+    extension = _COMMON_EXTENSIONS.get(mime_type)
+    if extension is not None:
+        return extension
+    return mimetypes.guess_extension(mime_type) or ".bin"
 
 
 class WritableSerializerMethodField(serializers.Field):
@@ -27,6 +77,8 @@ class WritableSerializerMethodField(serializers.Field):
     def __init__(self, method_name=None, save_method_name=None, **kwargs):
         self.method_name = method_name
         self.save_method_name = save_method_name
+        self._method = None
+        self._save_method = None
         kwargs["read_only"] = False
         super().__init__(**kwargs)
 
@@ -46,12 +98,20 @@ class WritableSerializerMethodField(serializers.Field):
 
         super().bind(field_name, parent)
 
+        # Resolve the bound methods once instead of on every (de)serialization
+        self._method = getattr(parent, self.method_name, None)
+        self._save_method = getattr(parent, self.save_method_name, None)
+
     def to_representation(self, value):
-        method = getattr(self.parent, cast("str", self.method_name))
+        method = self._method
+        if method is None:
+            method = getattr(self.parent, self.method_name)
         return method(value)
 
     def to_internal_value(self, data):
-        method = getattr(self.parent, cast("str", self.save_method_name))
+        method = self._save_method
+        if method is None:
+            method = getattr(self.parent, self.save_method_name)
         return method(data)
 
     def get_attribute(self, instance):
@@ -75,35 +135,102 @@ class Base64FileField(serializers.FileField):
     """
 
     def _get_content_file_from_base64_string_or_none(
-        self, base64_str: "str", name: "Optional[str]" = None
-    ) -> "Optional[ContentFile]":
-        if isinstance(base64_str, six.string_types):
-            if "data:" in base64_str and ";base64," in base64_str:
-                header, base64_str = base64_str.split(";base64,")
-            else:
-                raise ValueError(
-                    "Invalid base64 string. It should contain 'data:' and ';base64,'."
-                )
-
-            try:
-                decoded_file = base64.b64decode(base64_str)
-            except TypeError:
-                raise ValueError(
-                    "_get_content_file_from_base64_string_or_none: invalid file."
-                )
-
-            if name is None:
-                file_name = str(uuid.uuid4())[:12]
-                file_extension = mimetypes.guess_extension(header.replace("data:", ""))
-                if file_extension is None:
-                    file_extension = ".bin"
-                complete_file_name = file_name + file_extension
-            else:
-                complete_file_name = name
-            return ContentFile(decoded_file, name=complete_file_name)
+        self,
+        base64_str: "Union[str, bytes, bytearray, memoryview]",
+        name: "Optional[str]" = None,
+    ) -> "Optional[Union[ContentFile, TemporaryUploadedFile]]":
+        if isinstance(base64_str, str):
+            data_prefix, separator = _DATA_URI_PREFIX, _BASE64_SEPARATOR
+        elif isinstance(base64_str, (bytes, bytearray, memoryview)):
+            # Binary payloads are decoded as is, avoiding a roundtrip through str
+            base64_str = bytes(base64_str)
+            data_prefix, separator = _DATA_URI_PREFIX_BYTES, _BASE64_SEPARATOR_BYTES
         else:
             return None
 
+        # The header is always at the start of the data URI, so only the first
+        # few bytes are searched and the payload itself is never scanned.
+        separator_index = base64_str.find(separator, 0, _HEADER_MAX_LENGTH)
+        if separator_index < len(data_prefix) or not base64_str.startswith(data_prefix):
+            raise ValueError(
+                "Invalid base64 string. It should contain 'data:' and ';base64,'."
+            )
+        header = base64_str[:separator_index]
+        if isinstance(header, bytes):
+            header = header.decode("ascii")
+        mime_type = header[len(_DATA_URI_PREFIX) :]
+        payload = base64_str[separator_index + len(separator) :]
+
+        if name is None:
+            file_name = uuid.uuid4().hex[:12]
+            file_extension = _get_extension_for_mime_type(mime_type)
+            complete_file_name = file_name + file_extension
+        else:
+            complete_file_name = name
+
+        if len(payload) > settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+            return self._decode_to_temporary_file(
+                payload, name=complete_file_name, content_type=mime_type
+            )
+
+        try:
+            decoded_file = _b64decode(payload)
+        except TypeError:
+            raise ValueError(
+                "_get_content_file_from_base64_string_or_none: invalid file."
+            )
+        return ContentFile(decoded_file, name=complete_file_name)
+
+    def _decode_to_temporary_file(
+        self,
+        payload: "Union[str, bytes]",
+        name: "str",
+        content_type: "str",
+    ) -> "TemporaryUploadedFile":
+        """Decodes a large base64 payload into a temporary file on disk, one chunk at a time.
+
+        This keeps memory usage bounded by the chunk size instead of holding the whole decoded file in memory.
+        """
+        file = TemporaryUploadedFile(
+            name=name, content_type=content_type, size=0, charset=None
+        )
+        if isinstance(payload, bytes):
+            # Slicing a memoryview does not copy the underlying buffer
+            payload = memoryview(payload)
+
+        try:
+            try:
+                size = 0
+                for start in range(0, len(payload), _DECODE_CHUNK_SIZE):
+                    chunk = _b64decode(payload[start : start + _DECODE_CHUNK_SIZE])
+                    file.write(chunk)
+                    size += len(chunk)
+            except binascii.Error:
+                # Payloads containing characters outside the base64 alphabet
+                # (e.g. line breaks) may not split evenly into chunks, so those
+                # are decoded at once instead.
+                file.seek(0)
+                file.truncate()
+                chunk = _b64decode(payload)
+                file.write(chunk)
+                size = len(chunk)
+        except binascii.Error:
+            file.close()
+            raise
+        except (TypeError, ValueError):
+            # e.g. str payloads containing non-ASCII characters
+            file.close()
+            raise ValueError(
+                "_get_content_file_from_base64_string_or_none: invalid file."
+            )
+        except Exception:
+            file.close()
+            raise
+
+        file.size = size
+        file.seek(0)
+        return file
+
     def to_representation(self, value):
         empty_response = {"url": None}
         if not value:
@@ -129,3 +256,27 @@ class Base64FileField(serializers.FileField):
         if data is empty or not data.get("data"):
             raise SkipField()
         return super().validate_empty_values(data)
+
+
+class ISODateField(serializers.DateField):
+    """A DateField that parses "YYYY-MM-DD" strings directly with `date.fromisoformat`.
+
+    Only used when ISO 8601 is the first accepted input format (DRF's default). Any other value goes through the regular DateField parsing, so the accepted inputs and error messages are the same.
+
+    Example:
+
+        class ProfileSerializer(ModelSerializer):
+            birth_date = ISODateField()
+    """
+
+    def to_internal_value(self, value):
+        if isinstance(value, str) and len(value) == 10 and value[4] == value[7] == "-":
+            input_formats = getattr(
+                self, "input_formats", api_settings.DATE_INPUT_FORMATS
+            )
+            if input_formats and input_formats[0].lower() == ISO_8601:
+                try:
+                    return datetime.date.fromisoformat(value)
+                except ValueError:
+                    pass
+        return super().to_internal_value(value)
@@ -1,2 +1,23 @@
-from .utils import save_nested_serializers, save_nested_choice_serializers, NestedListSerializer, NestedRelationChoiceField
+from importlib import import_module
 
+__all__ = [
+    "save_nested_serializers",
+    "save_nested_choice_serializers",
+    "NestedChoiceListSerializer",
+    "NestedListSerializer",
+    "NestedRelationChoiceField",
+]
+
+
+def __getattr__(name):
+    # The utils module is only imported when one of its names is first used,
+    # keeping it out of the import time of modules that never need it
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(".utils", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
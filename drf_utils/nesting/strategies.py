@@ -1,8 +1,48 @@
+from functools import lru_cache
 from rest_framework import serializers, fields
-from typing import Any, Dict, cast, Protocol, Optional
+from typing import Any, Dict, List, NamedTuple, Type, cast, Protocol, Optional
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files import File
 from django.db import models
 
 
+class NestedFieldInfo(NamedTuple):
+    """Relationship metadata of a model field that holds nested objects.
+
+    Attributes:
+        field: The model field (or reverse relation) itself.
+        accessor_name: Name of the reverse relation accessor on the parent object. None for forward relations.
+        fk_parent_field_name: Name of the field in the child model that references the parent object. None for forward relations.
+        remote_model: Model class of the nested objects.
+    """
+
+    field: "Any"
+    accessor_name: "Optional[str]"
+    fk_parent_field_name: "Optional[str]"
+    remote_model: "Optional[Type[models.Model]]"
+
+
+@lru_cache(maxsize=None)
+def get_nested_field_info(model_class, field_name: "str") -> "NestedFieldInfo":
+    """Returns the relationship metadata of a model field.
+
+    The result is cached since Django model metadata does not change once the app registry is ready.
+    """
+    field = model_class._meta.get_field(field_name)
+    if isinstance(field, models.ForeignObjectRel):
+        accessor_name = field.get_accessor_name()
+        fk_parent_field_name = field.field.name
+    else:
+        accessor_name = None
+        fk_parent_field_name = None
+    return NestedFieldInfo(
+        field=field,
+        accessor_name=accessor_name,
+        fk_parent_field_name=fk_parent_field_name,
+        remote_model=field.related_model,
+    )
+
+
 class NestedPreSaveStrategy(Protocol):
     def __call__(
         self,
@@ -10,6 +50,7 @@ class NestedPreSaveStrategy(Protocol):
         field_name: "str",
         parent_instance: "Optional[models.Model]",
         data: "Optional[Dict[str, Any]]",
+        validated_data: "Any",
     ) -> "Optional[models.Model]":
         ...
 
@@ -20,60 +61,176 @@ class NestedPostSaveStrategy(Protocol):
         field_name: "str",
         parent_instance: "models.Model",
         data: "Dict[str, Any]",
+        validated_data: "Any",
     ) -> "None":
         ...
 
 
+def _set_validated_data(
+    serializer_field: "serializers.BaseSerializer",
+    data: "Any",
+    validated_data: "Any",
+):
+    """Marks a nested serializer as valid using the data already validated by the parent serializer.
+
+    The parent serializer validates its nested serializers as part of its own validation, so running is_valid() again on them would repeat the whole validation chain.
+    """
+    serializer_field.initial_data = data
+    serializer_field._validated_data = validated_data
+    if isinstance(serializer_field, serializers.ListSerializer):
+        serializer_field._errors = []
+    else:
+        serializer_field._errors = {}
+
+
+def _get_changed_fields(
+    instance: "models.Model", data: "Dict[str, Any]"
+) -> "List[str]":
+    """Returns the names of the fields in data whose values differ from the ones in the model instance.
+
+    Foreign keys are compared by their primary key, so the related objects are not fetched. Values that cannot be compared with a model attribute (many-to-many, reverse relations, files or non model fields) are always considered changed.
+    """
+    opts = instance._meta
+    changed_fields = []
+    for attr, value in data.items():
+        try:
+            field = opts.get_field(attr)
+        except FieldDoesNotExist:
+            changed_fields.append(attr)
+            continue
+        if field.many_to_many or not field.concrete:
+            changed_fields.append(attr)
+            continue
+        if isinstance(field, models.FileField) or isinstance(value, File):
+            # FieldFile only compares names, so a new upload with the name of
+            # the stored file would look unchanged
+            changed_fields.append(attr)
+            continue
+        if field.is_relation:
+            current_value = getattr(instance, field.attname)
+            if isinstance(value, models.Model):
+                value = value.pk
+        else:
+            current_value = getattr(instance, attr)
+        if current_value != value:
+            changed_fields.append(attr)
+    return changed_fields
+
+
+def _has_default_save(serializer: "serializers.BaseSerializer") -> "bool":
+    """Returns whether the serializer uses DRF's default save() and update().
+
+    Only then may saving an unchanged object be skipped, since a custom implementation may have other side effects.
+    """
+    serializer_class = type(serializer)
+    return (
+        serializer_class.save is serializers.BaseSerializer.save
+        and serializer_class.update is serializers.ModelSerializer.update
+    )
+
+
+def _is_unchanged(
+    serializer_field: "serializers.BaseSerializer",
+    validated_data: "Any",
+    save_kwargs: "Dict[str, Any]",
+) -> "bool":
+    """Returns whether saving a nested serializer would leave its existing object as it is in the database.
+
+    Uses the same comparison as `_get_changed_fields`, so file uploads always count as changes.
+    """
+    instance = serializer_field.instance
+    if instance is None or not isinstance(validated_data, dict):
+        return False
+    if not _has_default_save(serializer_field):
+        return False
+    return not _get_changed_fields(instance, {**validated_data, **save_kwargs})
+
+
+def _cache_saved_children(
+    serializer: "serializers.ModelSerializer",
+    serializer_field: "serializers.BaseSerializer",
+    parent_instance: "models.Model",
+    reverse_relation: "str",
+    remote_model: "Type[models.Model]",
+    children: "Any",
+):
+    """Stores the saved children in the prefetch cache of the parent object.
+
+    The children left after the save are exactly the ones that were just saved, so rendering the parent afterwards does not need to query them again. The cache is only filled when it matches what a query would return: the children were saved by NestedListSerializer.update() itself (an overridden update() may return only part of them), the parent serializer has no post_save_nested_serializers hook (it runs afterwards and may change the children), every child has a primary key and the child model has no default ordering (the children are then sorted by primary key).
+    """
+    from .utils import NestedListSerializer
+
+    if type(serializer_field).update is not NestedListSerializer.update:
+        return
+    if hasattr(serializer, "post_save_nested_serializers"):
+        return
+    if not isinstance(children, list) or remote_model._meta.ordering:
+        return
+    if not all(
+        isinstance(child, remote_model) and child.pk is not None for child in children
+    ):
+        return
+    if not hasattr(parent_instance, "_prefetched_objects_cache"):
+        parent_instance._prefetched_objects_cache = {}
+    queryset = getattr(parent_instance, reverse_relation).all()
+    queryset._result_cache = sorted(children, key=lambda child: child.pk)
+    queryset._prefetch_done = True
+    parent_instance._prefetched_objects_cache[reverse_relation] = queryset
+
+
 def update_reverse_foreign_key_strategy(
     serializer: "serializers.ModelSerializer",
     field_name: "str",
     parent_instance: "models.Model",
     data: "Dict[str, Any]",
+    validated_data: "Any",
 ):
     """Updates the parent object using the REVERSE_FOREIGN_KEY strategy."""
-    model_field: "models.ManyToOneRel" = serializer.Meta.model._meta.get_field(
-        field_name
-    )
-    reverse_relation = model_field.get_accessor_name()
-    fk_parent_field_name = model_field.field.name
+    field_info = get_nested_field_info(serializer.Meta.model, field_name)
+    reverse_relation = field_info.accessor_name
+    fk_parent_field_name = field_info.fk_parent_field_name
 
     serializer_field = cast("Dict[str, fields.Field]", serializer.fields)[field_name]
-    serializer_field.initial_data = data
     serializer_field.instance = getattr(parent_instance, reverse_relation)
 
-    if hasattr(serializer_field, "_validated_data"):
-        delattr(serializer_field, "_validated_data")
-
-    serializer_field.is_valid(raise_exception=True)
+    _set_validated_data(serializer_field, data, validated_data)
 
     save_kwargs = {
         fk_parent_field_name: parent_instance,
         "fk_parent_field_name": fk_parent_field_name,
     }
 
-    serializer_field.save(**save_kwargs)
+    children = serializer_field.save(**save_kwargs)
+    _cache_saved_children(
+        serializer,
+        serializer_field,
+        parent_instance,
+        reverse_relation,
+        field_info.remote_model,
+        children,
+    )
 
 def update_foreign_key_strategy(
     serializer: "serializers.ModelSerializer",
     field_name: "str",
     parent_instance: "Optional[models.Model]",
     data: "Optional[Dict[str, Any]]",
+    validated_data: "Any",
 ):
     """Updates the parent object using the FOREIGN_KEY strategy."""
     serializer_field = cast("Dict[str, fields.Field]", serializer.fields)[field_name]
-    serializer_field.initial_data = data
     if parent_instance:
         serializer_field.instance = getattr(parent_instance, field_name)
     else:
         serializer_field.instance = None
 
-    if hasattr(serializer_field, "_validated_data"):
-        delattr(serializer_field, "_validated_data")
-
-    serializer_field.is_valid(raise_exception=True)
+    _set_validated_data(serializer_field, data, validated_data)
     if not data:
         return None
 
+    if _is_unchanged(serializer_field, validated_data, {}):
+        # Resubmitted objects that match the database need no write
+        return serializer_field.instance
     return serializer_field.save()
 
 def update_reverse_one_to_one_strategy(
@@ -81,30 +238,27 @@ def update_reverse_one_to_one_strategy(
     field_name: "str",
     parent_instance: "models.Model",
     data: "Dict[str, Any]",
+    validated_data: "Any",
 ):
     """Updates the parent object using the REVERSE_ONE_TO_ONE strategy."""
-    model_field: "models.ManyToOneRel" = serializer.Meta.model._meta.get_field(
-        field_name
-    )
-    reverse_relation = model_field.get_accessor_name()
-    fk_parent_field_name = model_field.field.name
-    remote_model = model_field.related_model
+    field_info = get_nested_field_info(serializer.Meta.model, field_name)
+    reverse_relation = field_info.accessor_name
+    fk_parent_field_name = field_info.fk_parent_field_name
+    remote_model = field_info.remote_model
 
     serializer_field = cast("Dict[str, fields.Field]", serializer.fields)[field_name]
-    serializer_field.initial_data = data
     try:
         serializer_field.instance = getattr(parent_instance, reverse_relation)
     except remote_model.DoesNotExist:
         serializer_field.instance = None
-    if hasattr(serializer_field, "_validated_data"):
-        delattr(serializer_field, "_validated_data")
-
-    serializer_field.is_valid(raise_exception=True)
+    _set_validated_data(serializer_field, data, validated_data)
 
     save_kwargs = {
         fk_parent_field_name: parent_instance,
     }
 
+    if _is_unchanged(serializer_field, validated_data, save_kwargs):
+        return
     serializer_field.save(**save_kwargs)
 
 
@@ -113,23 +267,22 @@ def update_one_to_one_strategy(
     field_name: "str",
     parent_instance: "Optional[models.Model]",
     data: "Optional[Dict[str, Any]]",
+    validated_data: "Any",
 ) -> "Optional[models.Model]":
     """Updates the parent object using the ONE_TO_ONE strategy."""
 
     serializer_field = cast("Dict[str, fields.Field]", serializer.fields)[field_name]
-    serializer_field.initial_data = data
     if parent_instance:
         serializer_field.instance = getattr(parent_instance, field_name)
     else:
         serializer_field.instance = None
 
-    if hasattr(serializer_field, "_validated_data"):
-        delattr(serializer_field, "_validated_data")
-
-    serializer_field.is_valid(raise_exception=True)
+    _set_validated_data(serializer_field, data, validated_data)
 
     if serializer_field.instance and not data:
         serializer_field.instance.delete()
         return None
 
+    if _is_unchanged(serializer_field, validated_data, {}):
+        return serializer_field.instance
     return serializer_field.save()
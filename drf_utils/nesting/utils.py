@@ -1,20 +1,40 @@
 # -*- coding: utf-8 -*-
-import uuid
+from contextlib import nullcontext
 from enum import Enum
-from typing import Callable, List, Tuple, TypedDict
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
-from django.db import models, transaction
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections, models, router, transaction
 from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 
 from .strategies import (
     NestedPostSaveStrategy,
     NestedPreSaveStrategy,
+    _get_changed_fields,
+    _has_default_save,
+    _set_validated_data,
+    get_nested_field_info,
     update_foreign_key_strategy,
     update_one_to_one_strategy,
     update_reverse_foreign_key_strategy,
     update_reverse_one_to_one_strategy,
 )
 
+# Sentinel used to tell missing keys apart from None values
+_MISSING = object()
+
 
 class NestedRelationshipType(Enum):
     """Enum that represents the type of relationship between the parent and child objects."""
@@ -39,7 +59,24 @@ class NestedSerializerSpec(TypedDict):
     model_field_name: "str"
 
 
-def save_nested_choice_serializers(field_names: "List[str]") -> "Callable":
+def _lock_instance(serializer: "serializers.ModelSerializer"):
+    """Re-fetches the instance being updated with SELECT ... FOR UPDATE.
+
+    Concurrent saves of the same object are then serialized instead of overwriting each other's changes. Must be called inside a transaction. Backends without row locks (e.g. SQLite) simply fetch the object again.
+    """
+    instance = serializer.instance
+    if instance is None:
+        return
+    serializer.instance = (
+        type(instance)._default_manager.select_for_update().get(pk=instance.pk)
+    )
+
+
+def save_nested_choice_serializers(
+    field_names: "List[str]",
+    lock_instance: "bool" = False,
+    savepoint: "bool" = True,
+) -> "Callable":
     """Decorator to be used in serializers that contain nested serializers that use the CHOICE strategy.
 
     The CHOICE strategy is used when the nested serializer will never be created or updated, only the relationship with the parent object will be created / updated.
@@ -48,6 +85,8 @@ def save_nested_choice_serializers(field_names: "List[str]") -> "Callable":
 
     Args:
         field_names (List[str]): List of names of the serializer fields that contain the nested serializers.
+        lock_instance (bool): If True, the instance being updated is re-fetched with SELECT ... FOR UPDATE before it is saved, avoiding lost updates under concurrent requests.
+        savepoint (bool): If False, the save joins an outer transaction (e.g. ATOMIC_REQUESTS) without creating a savepoint, saving a SAVEPOINT / RELEASE round trip. An error during the save then marks the whole outer transaction for rollback, so callers that catch it cannot keep using the transaction.
 
     Example:
         If you have two models like this:
@@ -109,16 +148,54 @@ def save_nested_choice_serializers(field_names: "List[str]") -> "Callable":
     def wrapper(klass):
         original = klass.save
 
+        # Lists of the serializer validate their choices with one query per
+        # field. The Meta of the serializer is left untouched, so the default
+        # list serializer is only replaced when a list is instantiated.
+        original_many_init = klass.many_init.__func__
+
+        def many_init(cls, *args, **kwargs):
+            list_serializer = original_many_init(cls, *args, **kwargs)
+            meta = getattr(cls, "Meta", None)
+            if type(list_serializer) is serializers.ListSerializer and not hasattr(
+                meta, "list_serializer_class"
+            ):
+                # Rebuilt from the same arguments, with a new child since the
+                # original one is already bound to the plain ListSerializer
+                child = list_serializer.child
+                list_kwargs = {
+                    **list_serializer._kwargs,
+                    "child": cls(*child._args, **child._kwargs),
+                }
+                list_serializer = NestedChoiceListSerializer(
+                    *list_serializer._args, **list_kwargs
+                )
+            return list_serializer
+
+        klass.many_init = classmethod(many_init)
+
         def wrapped(self, *args, **kwargs):
             validated_data = self.validated_data
-            nested_validated_data = {}
+            if validated_data is None:
+                return original(self, *args, **kwargs)
 
+            nested_validated_data = None
             for field_name in field_names:
-                if validated_data is not None and field_name in validated_data:
-                    nested_validated_data[field_name] = validated_data.pop(field_name)
-
-            with transaction.atomic():
-                kwargs.update(nested_validated_data)
+                value = validated_data.pop(field_name, _MISSING)
+                if value is not _MISSING:
+                    if nested_validated_data is None:
+                        nested_validated_data = {}
+                    nested_validated_data[field_name] = value
+
+            if nested_validated_data is None and not lock_instance:
+                # Nothing nested to associate, so there is no need to pay for
+                # a transaction / savepoint
+                return original(self, *args, **kwargs)
+
+            with transaction.atomic(savepoint=savepoint):
+                if lock_instance:
+                    _lock_instance(self)
+                if nested_validated_data is not None:
+                    kwargs.update(nested_validated_data)
                 parent_instance = original(self, *args, **kwargs)
 
             return parent_instance
@@ -129,6 +206,7 @@ def save_nested_choice_serializers(field_names: "List[str]") -> "Callable":
     return wrapper
 
 
+@lru_cache(maxsize=None)
 def _get_relationship_type(model_class, field_name: "str"):
     """Returns the type of relationship between the parent and child objects.
 
@@ -139,7 +217,7 @@ def _get_relationship_type(model_class, field_name: "str"):
     Returns:
         NestedRelationshipType: Type of relationship between the parent and child objects.
     """
-    field = model_class._meta.get_field(field_name)
+    field = get_nested_field_info(model_class, field_name).field
     if isinstance(field, models.OneToOneField):
         return NestedRelationshipType.ONE_TO_ONE
     elif isinstance(field, models.OneToOneRel):
@@ -154,33 +232,108 @@ def _get_relationship_type(model_class, field_name: "str"):
         raise ValueError(f"Invalid field type: {field}")
 
 
+_POST_SAVE_STRATEGIES: "Dict[NestedRelationshipType, NestedPostSaveStrategy]" = {
+    NestedRelationshipType.REVERSE_ONE_TO_ONE: update_reverse_one_to_one_strategy,
+    NestedRelationshipType.REVERSE_FOREIGN_KEY: update_reverse_foreign_key_strategy,
+}
+
+_PRE_SAVE_STRATEGIES: "Dict[NestedRelationshipType, NestedPreSaveStrategy]" = {
+    NestedRelationshipType.ONE_TO_ONE: update_one_to_one_strategy,
+    NestedRelationshipType.FOREIGN_KEY: update_foreign_key_strategy,
+}
+
+
 def _get_post_save_strategy(
     relationship_type: "NestedRelationshipType",
 ) -> "NestedPostSaveStrategy":
-    strategies_map = {
-        NestedRelationshipType.REVERSE_ONE_TO_ONE: update_reverse_one_to_one_strategy,
-        NestedRelationshipType.REVERSE_FOREIGN_KEY: update_reverse_foreign_key_strategy,
-    }
-    strategy = strategies_map.get(relationship_type)
-    if strategy is None:
+    try:
+        return _POST_SAVE_STRATEGIES[relationship_type]
+    except KeyError:
         raise ValueError(f"Invalid relationship type: {relationship_type}")
-    return strategy
 
 
 def _get_pre_save_strategy(
     relationship_type: "NestedRelationshipType",
 ) -> "NestedPreSaveStrategy":
-    strategies_map = {
-        NestedRelationshipType.ONE_TO_ONE: update_one_to_one_strategy,
-        NestedRelationshipType.FOREIGN_KEY: update_foreign_key_strategy,
-    }
-    strategy = strategies_map.get(relationship_type)
-    if strategy is None:
+    try:
+        return _PRE_SAVE_STRATEGIES[relationship_type]
+    except KeyError:
         raise ValueError(f"Invalid relationship type: {relationship_type}")
-    return strategy
 
 
-def save_nested_serializers(field_names: "List[str]") -> "Callable":
+class NestedSaveSpec(NamedTuple):
+    """Precomputed information used to save the objects of one nested serializer field."""
+
+    field_name: "str"
+    relationship_type: "NestedRelationshipType"
+    strategy: "Union[NestedPreSaveStrategy, NestedPostSaveStrategy]"
+
+
+class NestedSavePlan(NamedTuple):
+    """Nested serializer fields saved before (FOREIGN_KEY, ONE_TO_ONE) and after (REVERSE_*) the parent object."""
+
+    pre_save: "Tuple[NestedSaveSpec, ...]"
+    post_save: "Tuple[NestedSaveSpec, ...]"
+
+
+def _build_nested_save_plan(
+    model_class, field_names: "Tuple[str, ...]"
+) -> "NestedSavePlan":
+    """Classifies the nested fields of a serializer into the ones saved before and after the parent object.
+
+    The result only depends on the model and on the field names, so it is computed once per serializer class and set of fields present in the payload, and reused on every save.
+
+    Args:
+        model_class (Model): Model class of the parent object.
+        field_names (Tuple[str, ...]): Names of the serializer fields that contain the nested serializers.
+
+    Returns:
+        NestedSavePlan: The pre save and post save specs.
+    """
+    # Nested serializers that will be saved before the parent object is saved
+    pre_save_specs = []
+    # Nested serializers that will be saved after the parent object is saved
+    post_save_specs = []
+    for field_name in field_names:
+        # Identify type of relationship
+        relationship_type = _get_relationship_type(model_class, field_name)
+
+        if relationship_type in [
+            NestedRelationshipType.FOREIGN_KEY,
+            NestedRelationshipType.ONE_TO_ONE,
+        ]:
+            pre_save_specs.append(
+                NestedSaveSpec(
+                    field_name=field_name,
+                    relationship_type=relationship_type,
+                    strategy=_get_pre_save_strategy(relationship_type),
+                )
+            )
+        elif relationship_type in [
+            NestedRelationshipType.REVERSE_ONE_TO_ONE,
+            NestedRelationshipType.REVERSE_FOREIGN_KEY,
+        ]:
+            post_save_specs.append(
+                NestedSaveSpec(
+                    field_name=field_name,
+                    relationship_type=relationship_type,
+                    strategy=_get_post_save_strategy(relationship_type),
+                )
+            )
+        else:
+            raise NotImplementedError(
+                f"Relationship type {relationship_type} is not supported yet"
+            )
+    return NestedSavePlan(
+        pre_save=tuple(pre_save_specs), post_save=tuple(post_save_specs)
+    )
+
+
+def save_nested_serializers(
+    field_names: "List[str]",
+    lock_instance: "bool" = False,
+    savepoint: "bool" = True,
+) -> "Callable":
     """Decorator to be used in serializers that contain nested serializers and that use the NESTED strategy.
 
     The NESTED strategy is used when the objects of the nested serializer will be created if they do not exist or updated if they already exist, always maintaining the relationship with the parent object.
@@ -189,6 +342,8 @@ def save_nested_serializers(field_names: "List[str]") -> "Callable":
 
     Args:
         field_names (List[str]): List of names of the serializer fields that contain the nested serializers.
+        lock_instance (bool): If True, the instance being updated is re-fetched with SELECT ... FOR UPDATE before the nested objects are saved, avoiding lost updates under concurrent requests.
+        savepoint (bool): If False, the save joins an outer transaction (e.g. ATOMIC_REQUESTS) without creating a savepoint, saving a SAVEPOINT / RELEASE round trip. An error during the save then marks the whole outer transaction for rollback, so callers that catch it cannot keep using the transaction.
 
     The decorated serializer may optionally contain a method "def post_save_nested_serializers(instance: 'Model', is_created: 'bool') -> 'Model'" that will be called after the creation / update of the nested objects. This method must receive as a parameter the parent object and a boolean indicating whether the object was created or just edited. This method must return the parent object instance received.
 
@@ -253,67 +408,55 @@ def save_nested_serializers(field_names: "List[str]") -> "Callable":
     def wrapper(klass):
         original = klass.save
 
+        field_names_tuple = tuple(field_names)
+        # Save plans are stored per serializer class, since subclasses may
+        # define a different model, and per set of fields present in the
+        # payload, so that a field is only resolved when it is actually sent
+        klass._nested_save_plans = {}
+
         def wrapped(self, *args, **kwargs):
             # Extract the nested data from the validated data
             validated_data = self.validated_data
             initial_data = self.initial_data
+            nested_initial_data = {}
             nested_validated_data = {}
 
-            post_save_specs: "List[Tuple[NestedRelationshipType, str]]" = (
-                []
-            )  # Nested serializers that will be saved after the parent object is saved
-            pre_save_specs = (
-                []
-            )  # Nested serializers that will be saved before the parent object is saved
-            for field_name in field_names:
+            for field_name in field_names_tuple:
                 if field_name in validated_data:
-                    # Store the nested data in a separate dictionary
-                    validated_data.pop(field_name)
-                    nested_validated_data[field_name] = initial_data[field_name]
-
-                    # Identify type of relationship
-                    relationship_type = _get_relationship_type(
-                        self.Meta.model, field_name
-                    )
-
-                    if relationship_type in [
-                        NestedRelationshipType.FOREIGN_KEY,
-                        NestedRelationshipType.ONE_TO_ONE,
-                    ]:
-                        pre_save_specs.append(
-                            (
-                                relationship_type,
-                                field_name,
-                            )
-                        )
-                    elif relationship_type in [
-                        NestedRelationshipType.REVERSE_ONE_TO_ONE,
-                        NestedRelationshipType.REVERSE_FOREIGN_KEY,
-                    ]:
-                        post_save_specs.append(
-                            (
-                                relationship_type,
-                                field_name,
-                            )
-                        )
-                    else:
-                        raise NotImplementedError(
-                            f"Relationship type {relationship_type} is not supported yet"
-                        )
-
-            with transaction.atomic():
+                    # Store the nested data in separate dictionaries
+                    nested_validated_data[field_name] = validated_data.pop(field_name)
+                    nested_initial_data[field_name] = initial_data[field_name]
+
+            plan_key = (type(self), tuple(nested_validated_data))
+            save_plan = klass._nested_save_plans.get(plan_key)
+            if save_plan is None:
+                save_plan = _build_nested_save_plan(self.Meta.model, plan_key[1])
+                klass._nested_save_plans[plan_key] = save_plan
+
+            # Only open a transaction when there are nested objects or a
+            # post_save_nested_serializers hook to be saved along with the
+            # parent object
+            if (
+                nested_validated_data
+                or lock_instance
+                or hasattr(self, "post_save_nested_serializers")
+            ):
+                atomic = transaction.atomic(savepoint=savepoint)
+            else:
+                atomic = nullcontext()
+            with atomic:
+                if lock_instance:
+                    _lock_instance(self)
                 pre_saved_instances = {}
 
                 # Save the nested objects
-                for relationship_type, field_name in pre_save_specs:
-                    pre_save_strategy: "NestedPreSaveStrategy" = _get_pre_save_strategy(
-                        relationship_type
-                    )
+                for field_name, _, pre_save_strategy in save_plan.pre_save:
                     instance = pre_save_strategy(
                         serializer=self,
                         field_name=field_name,
                         parent_instance=self.instance,
-                        data=nested_validated_data[field_name],
+                        data=nested_initial_data[field_name],
+                        validated_data=nested_validated_data[field_name],
                     )
                     pre_saved_instances[field_name] = instance
 
@@ -323,17 +466,14 @@ def save_nested_serializers(field_names: "List[str]") -> "Callable":
                 parent_instance = original(self, *args, **kwargs)
 
                 # Save the nested objects
-                for relationship_type, field_name in post_save_specs:
-                    post_save_strategy: "NestedPostSaveStrategy" = (
-                        _get_post_save_strategy(relationship_type)
-                    )
+                for field_name, _, post_save_strategy in save_plan.post_save:
                     post_save_strategy(
                         serializer=self,
                         field_name=field_name,
                         parent_instance=parent_instance,
-                        data=nested_validated_data[field_name],
+                        data=nested_initial_data[field_name],
+                        validated_data=nested_validated_data[field_name],
                     )
-                parent_instance.save()
 
                 if hasattr(self, "post_save_nested_serializers"):
                     parent_instance = self.post_save_nested_serializers(
@@ -348,40 +488,249 @@ def save_nested_serializers(field_names: "List[str]") -> "Callable":
     return wrapper
 
 
-class NestedListSerializer(serializers.ListSerializer):
-    """Classe base para ser utilizada como "serializer_list_class" em serializers aninhados."""
+class NestedChoiceListSerializer(serializers.ListSerializer):
+    """ListSerializer that validates the NestedRelationChoiceField fields of all the items with a single query per field, instead of one query per item.
+
+    It is used by default when a serializer decorated with save_nested_choice_serializers is instantiated with many=True and does not define a `list_serializer_class`.
+    """
+
+    def to_internal_value(self, data):
+        prefetched_fields = self._prefetch_choices(data)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            for field in prefetched_fields:
+                field.clear_prefetched_choices()
+
+    def _prefetch_choices(self, data) -> "List[NestedRelationChoiceField]":
+        if not isinstance(data, list):
+            return []
+        prefetched_fields = []
+        for field in self.child._writable_fields:
+            if isinstance(field, serializers.ManyRelatedField):
+                choice_field = field.child_relation
+                many = True
+            else:
+                choice_field = field
+                many = False
+            if not isinstance(choice_field, NestedRelationChoiceField):
+                continue
+
+            items = []
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                value = item.get(field.field_name)
+                if many:
+                    if isinstance(value, list):
+                        items.extend(value)
+                elif value is not None:
+                    items.append(value)
+            if choice_field.prefetch_choices(items):
+                prefetched_fields.append(choice_field)
+        return prefetched_fields
+
+
+class NestedListSerializer(NestedChoiceListSerializer):
+    """Classe base para ser utilizada como "serializer_list_class" em serializers aninhados.
+
+    By default every nested item is saved through the child serializer. Subclasses may set `bulk_save_threshold` so that lists with at least that many items are written with `bulk_create` / `bulk_update` instead, in batches of `bulk_batch_size`. The bulk path skips the child serializer's `create()` / `update()` and the model's `save()`, so it should only be enabled for child serializers without custom save logic or writable nested fields. Items with many-to-many values always go through the child serializer.
+
+    On backends that support it, setting `bulk_upsert` writes the new and the changed objects with a single `bulk_create(update_conflicts=True)` instead of a `bulk_create` plus a `bulk_update`. Note that a row deleted concurrently is then inserted again instead of being left deleted.
+
+    Example:
+
+        class BulkNestedListSerializer(NestedListSerializer):
+            bulk_save_threshold = 100
+            bulk_upsert = True
+    """
+
+    bulk_save_threshold: "Optional[int]" = None
+    bulk_batch_size: "int" = 1000
+    bulk_upsert: "bool" = False
+
+    def to_representation(self, data):
+        # Child serializers using CompiledRepresentationMixin render the whole
+        # list at once
+        to_representation_many = getattr(self.child, "to_representation_many", None)
+        if to_representation_many is None:
+            return super().to_representation(data)
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return to_representation_many(iterable)
 
     def update(self, instance, validated_data):
-        objects_mapping = {object.id: object for object in instance.all()}
+        # If the children were prefetched (e.g. by EagerLoadingMixin), they are
+        # already in memory and no query is needed to find them
+        queryset = instance.all()
+        prefetched_objects = queryset._result_cache
+
+        # Ids the primary key field does not accept (e.g. "abc" for an integer
+        # key) cannot match an existing object, so those items are created
+        pk_field = instance.model._meta.pk
+        wanted_ids = []
+        for item in self.initial_data:
+            if "id" not in item:
+                continue
+            try:
+                pk_field.to_python(item["id"])
+            except DjangoValidationError:
+                continue
+            wanted_ids.append(item["id"])
+        if prefetched_objects is not None:
+            existing = {obj.pk: obj for obj in prefetched_objects}
+            objects_mapping = {
+                object_id: existing[object_id]
+                for object_id in wanted_ids
+                if object_id in existing
+            }
+        elif wanted_ids:
+            # Only the objects referenced by the payload need to be loaded
+            objects_mapping = instance.in_bulk(wanted_ids)
+        else:
+            objects_mapping = {}
+
         data_mapping = {}
         for initial_item, validated_item in zip(self.initial_data, validated_data):
             if "id" in initial_item:
                 validated_item["id"] = initial_item["id"]
 
-            data_mapping[
-                validated_item.get("id", str(uuid.uuid4())[:6])
-            ] = validated_item
+            # New items only need a key that is unique within the mapping and
+            # that never matches an existing object id
+            data_mapping[validated_item.get("id", object())] = validated_item
 
         ret = []
 
+        # Delete the objects that are no longer present in a single query. This
+        # runs before the creation loop so that the new objects are kept.
+        # Note that this bypasses any custom Model.delete(), although
+        # pre_delete and post_delete signals are still sent for every deleted
+        # object.
+        if prefetched_objects is not None:
+            stale_ids = [pk for pk in existing if pk not in objects_mapping]
+            if stale_ids:
+                instance.filter(pk__in=stale_ids).delete()
+        else:
+            kept_ids = [
+                object_id for object_id in data_mapping if object_id in objects_mapping
+            ]
+            instance.exclude(pk__in=kept_ids).delete()
+
+        # The prefetched children are about to change, so they must not be
+        # served from the cache when the parent is rendered again
+        if prefetched_objects is not None and hasattr(
+            instance, "_remove_prefetched_objects"
+        ):
+            instance._remove_prefetched_objects()
+
         # Create and update
+        if self._can_bulk_save(data_mapping):
+            return self._bulk_save(objects_mapping, data_mapping)
+
+        # The items were already validated by the parent serializer, so the
+        # single child serializer is reused for every item without running
+        # its validation again.
+        child = self.child
+        skip_unchanged = self._can_skip_unchanged_items()
         for object_id, data in data_mapping.items():
-            object = objects_mapping.get(object_id, None)
             fk_parent_field_name = data.pop("fk_parent_field_name")
-            if hasattr(self.child, "_validated_data"):
-                delattr(self.child, "_validated_data")
-            self.child.instance = object
-            self.child.initial_data = data
-            self.child.is_valid(raise_exception=True)
-            self.child.save(**{fk_parent_field_name: data[fk_parent_field_name]})
-
-        # Delete
-        for object_id, object in objects_mapping.items():
-            if object_id not in data_mapping:
-                object.delete()
+            parent_instance = data.pop(fk_parent_field_name)
+            child_validated_data = {
+                key: value for key, value in data.items() if key != "id"
+            }
+            obj = objects_mapping.get(object_id, None)
+            if (
+                skip_unchanged
+                and obj is not None
+                and not _get_changed_fields(
+                    obj, {**child_validated_data, fk_parent_field_name: parent_instance}
+                )
+            ):
+                # Resubmitted items that match the database need no write
+                ret.append(obj)
+                continue
+            child.instance = obj
+            _set_validated_data(child, data, child_validated_data)
+            ret.append(child.save(**{fk_parent_field_name: parent_instance}))
 
         return ret
 
+    def _can_skip_unchanged_items(self) -> "bool":
+        """Returns whether items identical to their database rows may be skipped."""
+        return _has_default_save(self.child)
+
+    def _can_bulk_save(self, data_mapping: "Dict[Any, Dict[str, Any]]") -> "bool":
+        if (
+            self.bulk_save_threshold is None
+            or len(data_mapping) < self.bulk_save_threshold
+        ):
+            return False
+        model = self.child.Meta.model
+        many_to_many = {field.name for field in model._meta.many_to_many}
+        return not any(
+            many_to_many.intersection(data) for data in data_mapping.values()
+        )
+
+    def _can_bulk_upsert(self, model) -> "bool":
+        if not self.bulk_upsert:
+            return False
+        connection = connections[router.db_for_write(model)]
+        # Only available on Django 4.1+ and on backends that support
+        # ON CONFLICT with a conflict target (PostgreSQL, SQLite 3.24+)
+        return getattr(
+            connection.features, "supports_update_conflicts_with_target", False
+        )
+
+    def _bulk_save(
+        self,
+        objects_mapping: "Dict[Any, models.Model]",
+        data_mapping: "Dict[Any, Dict[str, Any]]",
+    ):
+        """Creates and updates the nested objects with one query per batch instead of one per object.
+
+        The items have already been validated by the parent serializer, so they are not validated again. Returns the saved objects in the order of the payload.
+        """
+        model = self.child.Meta.model
+        pk_name = model._meta.pk.name
+        instances = []
+        to_create = []
+        to_update = []
+        update_fields = set()
+        for object_id, data in data_mapping.items():
+            data.pop("fk_parent_field_name")
+            data.pop(pk_name, None)
+            obj = objects_mapping.get(object_id, None)
+            if obj is None:
+                obj = model(**data)
+                to_create.append(obj)
+            else:
+                changed_fields = _get_changed_fields(obj, data)
+                for attr in changed_fields:
+                    setattr(obj, attr, data[attr])
+                if changed_fields:
+                    update_fields.update(changed_fields)
+                    to_update.append(obj)
+            instances.append(obj)
+
+        if to_update and update_fields and self._can_bulk_upsert(model):
+            # New and changed objects are written by the same call, existing
+            # rows being updated by INSERT ... ON CONFLICT DO UPDATE
+            model.objects.bulk_create(
+                to_create + to_update,
+                batch_size=self.bulk_batch_size,
+                update_conflicts=True,
+                unique_fields=[pk_name],
+                update_fields=sorted(update_fields),
+            )
+            return instances
+
+        if to_create:
+            model.objects.bulk_create(to_create, batch_size=self.bulk_batch_size)
+        if to_update and update_fields:
+            model.objects.bulk_update(
+                to_update, update_fields, batch_size=self.bulk_batch_size
+            )
+        return instances
+
 
 class NestedRelationChoiceField(serializers.RelatedField):
     """This field is used to represent a nested relationship in a serializer that uses the CHOICE strategy. It should be used in conjunction with the save_nested_choice_serializers decorator."""
@@ -402,6 +751,8 @@ class NestedRelationChoiceField(serializers.RelatedField):
         if queryset is None:
             queryset = self.model.objects.all()
         kwargs["queryset"] = queryset
+        # Objects fetched in advance by prefetch_choices(), by id
+        self._prefetched_choices = None
         super().__init__(**kwargs)
 
     def to_representation(self, value):
@@ -413,10 +764,25 @@ class NestedRelationChoiceField(serializers.RelatedField):
             return self.queryset(self.parent.instance, self.parent.context)
         return super().get_queryset()
 
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return NestedManyRelationChoiceField(**list_kwargs)
+
     def to_internal_value(self, data):
         if not isinstance(data, self.model):
             if not isinstance(data, dict):
                 raise ValueError("Invalid data type. Expected a dictionary. Did you forget to pass the parameter 'many=True'?")
+            if self._prefetched_choices is not None:
+                instance = self._prefetched_choices.get(
+                    self.model._meta.get_field("id").to_python(data["id"])
+                )
+                if instance is None:
+                    self.fail("invalid_choice", pk_value=data["id"])
+                return instance
             try:
                 instance = self.get_queryset().get(id=data["id"])
             except self.model.DoesNotExist:
@@ -425,3 +791,71 @@ class NestedRelationChoiceField(serializers.RelatedField):
         else:
             instance = data
         return instance
+
+    def prefetch_choices(self, data) -> "bool":
+        """Fetches with a single query the objects selected by a list of items, so that validating each item does not query the database again.
+
+        Returns False, fetching nothing, if the queryset depends on the instance being validated or if some item has an invalid id. Call clear_prefetched_choices() once the items are validated.
+        """
+        if callable(self.queryset):
+            return False
+        ids = self._get_choice_ids(data)
+        if ids is None:
+            return False
+        self._prefetched_choices = self._fetch_choices(ids)
+        return True
+
+    def clear_prefetched_choices(self):
+        self._prefetched_choices = None
+
+    def _get_choice_ids(self, data) -> "Optional[set]":
+        """Returns the ids of the dict items converted to the type of the id field, or None if some id is invalid."""
+        id_field = self.model._meta.get_field("id")
+        ids = set()
+        try:
+            for item in data:
+                if isinstance(item, dict):
+                    ids.add(id_field.to_python(item["id"]))
+        except (DjangoValidationError, KeyError, TypeError):
+            return None
+        return ids
+
+    def _fetch_choices(self, ids) -> "Dict[Any, models.Model]":
+        if not ids:
+            return {}
+        return self.get_queryset().in_bulk(ids, field_name="id")
+
+    def to_internal_value_many(self, data):
+        """Returns the objects selected by a list of items, fetching them with a single query instead of one per item."""
+        if self._prefetched_choices is not None:
+            return [self.to_internal_value(item) for item in data]
+
+        ids = self._get_choice_ids(data)
+        if ids is None:
+            # Let the regular lookup report the invalid item
+            return [self.to_internal_value(item) for item in data]
+
+        id_field = self.model._meta.get_field("id")
+        instances = self._fetch_choices(ids)
+        ret = []
+        for item in data:
+            if isinstance(item, dict):
+                instance = instances.get(id_field.to_python(item["id"]))
+                if instance is None:
+                    self.fail("invalid_choice", pk_value=item["id"])
+                ret.append(instance)
+            else:
+                ret.append(self.to_internal_value(item))
+        return ret
+
+
+class NestedManyRelationChoiceField(serializers.ManyRelatedField):
+    """The field created by NestedRelationChoiceField(many=True). All the selected objects are fetched with a single query."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        return self.child_relation.to_internal_value_many(data)
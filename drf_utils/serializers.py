@@ -1,8 +1,297 @@
+import copy
+from collections.abc import Mapping
+from typing import Tuple
+
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+_MISSING = object()
+
+
+class EagerLoadingMixin:
+    """Mixin for ModelSerializers that derives the `select_related` / `prefetch_related` calls needed to render its fields.
+
+    To-one relations rendered by nested serializers are loaded with `select_related` and to-many relations with `prefetch_related`, recursively. Views can then avoid N+1 queries on list endpoints:
+
+        def get_queryset(self):
+            return self.get_serializer_class().prefetch_queryset(super().get_queryset())
+
+    Passing `only_serialized_fields=True` also restricts the columns loaded for the model and its `select_related` relations to the ones rendered by the serializer, with `QuerySet.only()`. Any other column is deferred and costs an extra query if it is accessed, so this is meant for read endpoints. The restriction is skipped for serializers with fields whose columns cannot be determined (method fields, properties, dotted sources...).
+    """
+
+    @classmethod
+    def prefetch_queryset(cls, queryset, only_serialized_fields=False):
+        """Returns the queryset with the relations used by the serializer fields eagerly loaded."""
+        return cls().apply_eager_loading(
+            queryset, only_serialized_fields=only_serialized_fields
+        )
+
+    def apply_eager_loading(self, queryset, only_serialized_fields=False):
+        """Returns the queryset with the relations used by the fields of this serializer instance eagerly loaded."""
+        select_related, prefetch_related = self.get_eager_loading_lookups()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if only_serialized_fields:
+            only_fields = self.get_only_fields()
+            if only_fields is not None:
+                queryset = queryset.only(*only_fields)
+        return queryset
+
+    def get_eager_loading_lookups(self):
+        """Returns a tuple with the `select_related` and `prefetch_related` lookups needed by the serializer fields."""
+        select_related = []
+        prefetch_related = []
+        self._collect_eager_loading_lookups(
+            self, self.Meta.model, "", False, select_related, prefetch_related
+        )
+        return select_related, prefetch_related
+
+    def get_only_fields(self):
+        """Returns the model fields rendered by the serializer, in the format expected by `QuerySet.only()`, or None if they cannot be determined."""
+        only_fields = []
+        if not self._collect_only_fields(self, self.Meta.model, "", only_fields):
+            return None
+        return only_fields
+
+    @staticmethod
+    def _get_nested_serializer(field):
+        """Returns the serializer used to render the related objects of a field, if any."""
+        # Imported here so that importing this module does not load the
+        # nesting utilities
+        from .nesting.utils import NestedRelationChoiceField
+
+        if isinstance(field, serializers.ListSerializer):
+            return field.child
+        if isinstance(field, serializers.BaseSerializer):
+            return field
+        if isinstance(field, serializers.ManyRelatedField):
+            field = field.child_relation
+        if isinstance(field, NestedRelationChoiceField):
+            return field.serializer_class(**field.serializer_params)
+        return None
+
+    def _collect_eager_loading_lookups(
+        self, serializer, model, prefix, is_prefetched, select_related, prefetch_related
+    ):
+        for field in serializer.fields.values():
+            source = field.source
+            if field.write_only or source == "*" or "." in source:
+                continue
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if not model_field.is_relation:
+                continue
+
+            lookup = prefix + source
+            is_to_many = model_field.many_to_many or model_field.one_to_many
+            if not isinstance(field, serializers.BaseSerializer):
+                related_field = field
+                if isinstance(field, serializers.ManyRelatedField):
+                    related_field = field.child_relation
+                if not isinstance(related_field, serializers.RelatedField):
+                    continue
+                if not is_to_many and related_field.use_pk_only_optimization():
+                    # The primary key is already available on the row
+                    continue
+            nested_serializer = self._get_nested_serializer(field)
+
+            if is_to_many or is_prefetched:
+                prefetch_related.append(lookup)
+            else:
+                select_related.append(lookup)
+
+            if isinstance(nested_serializer, serializers.ModelSerializer):
+                self._collect_eager_loading_lookups(
+                    nested_serializer,
+                    model_field.related_model,
+                    lookup + "__",
+                    is_to_many or is_prefetched,
+                    select_related,
+                    prefetch_related,
+                )
+
+    def _collect_only_fields(self, serializer, model, prefix, only_fields):
+        """Appends the lookups of the columns rendered by the serializer to only_fields. Returns False if they cannot be determined."""
+        for field in serializer._readable_fields:
+            source = field.source
+            if source == "*" or "." in source:
+                return False
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                # Method fields, properties...
+                return False
+            if model_field.many_to_many or model_field.one_to_many:
+                # Loaded by a separate query, no column of this model is rendered
+                continue
+
+            lookup = prefix + source
+            nested_serializer = self._get_nested_serializer(field)
+            if not (
+                model_field.is_relation
+                and isinstance(nested_serializer, serializers.ModelSerializer)
+            ):
+                only_fields.append(lookup)
+                continue
+
+            nested_only_fields = []
+            if self._collect_only_fields(
+                nested_serializer,
+                model_field.related_model,
+                lookup + "__",
+                nested_only_fields,
+            ):
+                if model_field.concrete:
+                    # The foreign key column is needed for the join
+                    only_fields.append(lookup)
+                only_fields.extend(nested_only_fields)
+            else:
+                # Loads every column of the related object
+                only_fields.append(lookup)
+        return True
+
+
+class CachedFieldsMixin:
+    """Mixin for ModelSerializers that builds the fields from the model only once per serializer class.
+
+    ModelSerializer introspects the model (field info, extra kwargs, uniqueness validators) whenever the fields of a new serializer instance are accessed. With this mixin the fields built the first time are kept as a template and every instance receives a deep copy of it, the same way DRF already copies declared fields. Only use it on serializers whose fields do not depend on the instance or on the context (e.g. `get_fields()` or `build_field()` overrides that read `self.context`).
+    """
+
+    def get_fields(self):
+        serializer_class = type(self)
+        # Looked up in the class __dict__ so that subclasses build their own
+        template = serializer_class.__dict__.get("_fields_template")
+        if template is None:
+            template = super().get_fields()
+            serializer_class._fields_template = template
+        return copy.deepcopy(template)
+
 
+class CompiledRepresentationMixin:
+    """Mixin for serializers that resolves how each readable field is rendered once and reuses it for every instance.
 
-class DynamicFieldsModelSerializer(serializers.ModelSerializer):
-    """A ModelSerializer that takes an additional `fields` and `exclude` argument that controls which fields should be displayed."""
+    Fields whose source is a plain attribute of a non mapping instance are read directly with `getattr`, skipping `Field.get_attribute`'s generic traversal; every other field goes through DRF's regular path. The output is identical to `Serializer.to_representation`. The plan is built on the first call, so fields must not be added or removed after an instance has been serialized.
+
+    Set `deduplicated_fields` to the names of low cardinality string fields (e.g. a state or a status) so that, when a list is rendered, equal values share a single string object instead of one copy per item:
+
+        class AddressSerializer(CompiledRepresentationMixin, ModelSerializer):
+            deduplicated_fields = ("state",)
+    """
+
+    deduplicated_fields: "Tuple[str, ...]" = ()
+
+    def _get_representation_plan(self):
+        plan = self.__dict__.get("_representation_plan")
+        if plan is None:
+            plan = tuple(
+                (
+                    field.field_name,
+                    field,
+                    self._get_plain_attribute_name(field),
+                    field.to_representation,
+                )
+                for field in self._readable_fields
+            )
+            self._representation_plan = plan
+        return plan
+
+    @staticmethod
+    def _get_plain_attribute_name(field):
+        if (
+            type(field).get_attribute is not serializers.Field.get_attribute
+            or len(field.source_attrs) != 1
+        ):
+            return None
+        return field.source_attrs[0]
+
+    def to_representation(self, instance):
+        return self._render(instance, self._get_representation_plan())
+
+    def to_representation_many(self, instances):
+        """Renders an iterable of instances, resolving the representation plan only once.
+
+        Used by NestedListSerializer. Falls back to calling to_representation() for each instance when a subclass overrides it.
+        """
+        if (
+            type(self).to_representation
+            is not CompiledRepresentationMixin.to_representation
+        ):
+            return [self.to_representation(instance) for instance in instances]
+        plan = self._get_representation_plan()
+        render = self._render
+        deduplicated_fields = self.deduplicated_fields
+        if not deduplicated_fields:
+            return [render(instance, plan) for instance in instances]
+
+        # Only lives while the list is rendered, unlike sys.intern()
+        strings = {}
+        ret = []
+        for instance in instances:
+            item = render(instance, plan)
+            for field_name in deduplicated_fields:
+                value = item.get(field_name)
+                if isinstance(value, str):
+                    item[field_name] = strings.setdefault(value, value)
+            ret.append(item)
+        return ret
+
+    @staticmethod
+    def _render(instance, plan):
+        ret = {}
+        # Mappings are read by key, which getattr() could shadow (e.g. a
+        # QueryDict "encoding" key)
+        is_mapping = isinstance(instance, Mapping)
+        for field_name, field, attribute_name, to_representation in plan:
+            attribute = _MISSING
+            if attribute_name is not None and not is_mapping:
+                attribute = getattr(instance, attribute_name, _MISSING)
+                if callable(attribute):
+                    # Methods and managers need DRF's handling
+                    attribute = _MISSING
+            if attribute is _MISSING:
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+
+            check_for_none = (
+                attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            )
+            if check_for_none is None:
+                ret[field_name] = None
+            else:
+                ret[field_name] = to_representation(attribute)
+        return ret
+
+
+class DynamicFieldsModelSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    """A ModelSerializer that takes an additional `fields` and `exclude` argument that controls which fields should be displayed.
+
+    Use `setup_eager_loading` to apply the `select_related` / `prefetch_related` calls needed by the selected fields to a queryset:
+
+        queryset = MySerializer.setup_eager_loading(queryset, fields=fields, exclude=exclude)
+    """
+
+    @classmethod
+    def setup_eager_loading(
+        cls, queryset, fields=None, exclude=None, only_serialized_fields=False
+    ):
+        """Returns the queryset with the relations used by the selected fields eagerly loaded.
+
+        See `EagerLoadingMixin` for how the lookups are derived.
+        """
+        kwargs = {"fields": fields}
+        if exclude is not None:
+            kwargs["exclude"] = exclude
+        return cls(**kwargs).apply_eager_loading(
+            queryset, only_serialized_fields=only_serialized_fields
+        )
 
     def __init__(self, *args, **kwargs):
         fields = kwargs.pop("fields", None)
@@ -11,54 +300,52 @@ class DynamicFieldsModelSerializer(serializers.ModelSerializer):
         self.initialize_fields(self, fields, exclude)
 
     def initialize_fields(self, serializer, fields, exclude):
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+
         if fields is not None:
-            allowed = list(fields)
-            nested_fields = []
-            for field in allowed:
-                if type(field) is dict:
-                    nested_fields.append(field)
-                    allowed.remove(field)
-                if field in exclude:
-                    allowed.remove(field)
-
-            exclude = list(exclude)
-            nested_exclude = []
+            exclude_names = {field for field in exclude if not isinstance(field, dict)}
+            nested_exclude = {}
             for field in exclude:
-                if type(field) is dict:
-                    nested_exclude.append(field)
-                    exclude.remove(field)
+                if isinstance(field, dict):
+                    for key, value in field.items():
+                        nested_exclude[key] = list(value)
+
+            nested_fields = [field for field in fields if isinstance(field, dict)]
+            allowed = [
+                field
+                for field in fields
+                if not isinstance(field, dict) and field not in exclude_names
+            ]
 
             for nested in nested_fields:
                 key = list(nested)[0]
                 nested_serializer = serializer.fields[key]
-
-                exclude_for_key = []
-                for nested_exc in nested_exclude:
-                    if key in nested_exc:
-                        exclude_for_key = list(nested_exc[key])
+                exclude_for_key = nested_exclude.get(key, [])
 
                 self.initialize_fields(nested_serializer, nested[key], exclude_for_key)
                 allowed.append(key)
 
-            fields = tuple(allowed)
-
-            self.select_fields(serializer, fields)
+            self.select_fields(serializer, set(allowed))
 
         elif exclude:
-            allowed = [
-                field for field in list(serializer.fields) if field not in exclude
-            ]
+            exclude_names = {field for field in exclude if not isinstance(field, dict)}
+            allowed = {
+                field for field in serializer.fields if field not in exclude_names
+            }
             self.select_fields(serializer, allowed)
 
             for field in exclude:
-                if type(field) is dict:
+                if isinstance(field, dict):
                     key = list(field)[0]
                     nested_serializer = serializer.fields[key]
                     self.initialize_fields(nested_serializer, None, field[key])
 
     def select_fields(self, serializer, fields):
-        allowed = set(fields)
-        existing = set(serializer.fields)
-        for field_name in existing - allowed:
+        allowed = fields if isinstance(fields, (set, frozenset)) else set(fields)
+        to_remove = [
+            field_name for field_name in serializer.fields if field_name not in allowed
+        ]
+        for field_name in to_remove:
             serializer.fields.pop(field_name)
 
@@ -25,6 +25,9 @@ setup(
     author='Luccas Correa',
     author_email='luccascorrea@estudio89.com.br',
     install_requires=install_requires,
+    extras_require={
+        'fast': ['pybase64>=1.3'],
+    },
     classifiers=[
         'Environment :: Web Environment',
         'Framework :: Django',
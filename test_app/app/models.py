@@ -33,3 +33,16 @@ class Book(models.Model):
     category = models.ForeignKey(
         "Category", on_delete=models.CASCADE, related_name="books", null=True
     )
+
+
+class Document(models.Model):
+    file = models.FileField()
+    profile = models.ForeignKey(
+        Profile, on_delete=models.CASCADE, related_name="documents", null=True
+    )
+
+
+class Contract(models.Model):
+    document = models.OneToOneField(
+        Document, on_delete=models.CASCADE, related_name="contract", null=True
+    )
@@ -1,14 +1,24 @@
+from drf_utils.fields import ISODateField
 from drf_utils.nesting import (
     save_nested_serializers,
     save_nested_choice_serializers,
     NestedListSerializer,
     NestedRelationChoiceField,
 )
+from drf_utils.serializers import (
+    CachedFieldsMixin,
+    CompiledRepresentationMixin,
+    EagerLoadingMixin,
+)
 from rest_framework.serializers import ModelSerializer
 from .models import Address, Profile, Book, Author, Category
 
 
-class AddressSerializer(ModelSerializer):
+class AddressSerializer(
+    CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
+    deduplicated_fields = ("city", "state", "neighborhood")
+
     class Meta:
         model = Address
         fields = (
@@ -23,7 +33,10 @@ class AddressSerializer(ModelSerializer):
 
 
 @save_nested_serializers(["addresses"])
-class ProfileSerializer(ModelSerializer):
+class ProfileSerializer(
+    EagerLoadingMixin, CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
+    birth_date = ISODateField()
     addresses = AddressSerializer(many=True)
 
     class Meta:
@@ -39,7 +52,9 @@ class ProfileSerializer(ModelSerializer):
         return instance
 
 
-class CategorySerializer(ModelSerializer):
+class CategorySerializer(
+    CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
     class Meta:
         model = Category
         fields = (
@@ -49,7 +64,9 @@ class CategorySerializer(ModelSerializer):
 
 
 @save_nested_choice_serializers(["category"])
-class BookSerializer(ModelSerializer):
+class BookSerializer(
+    EagerLoadingMixin, CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
     category = NestedRelationChoiceField(
         allow_null=False,
         serializer_class=CategorySerializer,
@@ -64,7 +81,7 @@ class BookSerializer(ModelSerializer):
         )
 
 
-class AuthorSerializer(ModelSerializer):
+class AuthorSerializer(CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer):
     class Meta:
         model = Author
         fields = (
@@ -74,7 +91,9 @@ class AuthorSerializer(ModelSerializer):
 
 
 @save_nested_choice_serializers(["authors"])
-class BookWithAuthorsSerializer(ModelSerializer):
+class BookWithAuthorsSerializer(
+    EagerLoadingMixin, CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
     authors = NestedRelationChoiceField(
         allow_null=False,
         serializer_class=AuthorSerializer,
@@ -91,7 +110,9 @@ class BookWithAuthorsSerializer(ModelSerializer):
 
 
 @save_nested_serializers(["profile"])
-class AuthorWithProfileSerializer(ModelSerializer):
+class AuthorWithProfileSerializer(
+    EagerLoadingMixin, CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
     profile = ProfileSerializer(allow_null=True)
 
     class Meta:
@@ -104,7 +125,10 @@ class AuthorWithProfileSerializer(ModelSerializer):
 
 
 @save_nested_serializers(["author", "addresses"])
-class ProfileWithAuthorSerializer(ModelSerializer):
+class ProfileWithAuthorSerializer(
+    EagerLoadingMixin, CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
+    birth_date = ISODateField()
     author = AuthorSerializer()
     addresses = AddressSerializer(many=True)
 
@@ -117,7 +141,11 @@ class ProfileWithAuthorSerializer(ModelSerializer):
             "addresses",
         )
 
-class SimpleProfileSerializer(ModelSerializer):
+class SimpleProfileSerializer(
+    CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
+    birth_date = ISODateField()
+
     class Meta:
         model = Profile
         fields = (
@@ -126,7 +154,9 @@ class SimpleProfileSerializer(ModelSerializer):
         )
 
 @save_nested_serializers(["profile"])
-class AddressWithProfileSerializer(ModelSerializer):
+class AddressWithProfileSerializer(
+    EagerLoadingMixin, CachedFieldsMixin, CompiledRepresentationMixin, ModelSerializer
+):
     profile = SimpleProfileSerializer(allow_null=True)
 
     class Meta:
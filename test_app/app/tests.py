@@ -1,10 +1,22 @@
+import binascii
 import datetime as dt
 import json
-
-from django.test import TestCase
-
-from .models import Address, Author, Book, Category, Profile
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from .models import Address, Author, Book, Category, Contract, Document, Profile
 from .serializers import (
+    AddressSerializer,
     AddressWithProfileSerializer,
     AuthorWithProfileSerializer,
     BookSerializer,
@@ -13,8 +25,33 @@ from .serializers import (
     ProfileSerializer,
     ProfileWithAuthorSerializer,
 )
-from drf_utils.nesting import save_nested_choice_serializers, NestedRelationChoiceField
-from rest_framework.serializers import ModelSerializer
+from drf_utils.fields import (
+    Base64FileField,
+    ISODateField,
+    WritableSerializerMethodField,
+)
+from drf_utils.nesting import (
+    NestedChoiceListSerializer,
+    NestedListSerializer,
+    NestedRelationChoiceField,
+    save_nested_choice_serializers,
+    save_nested_serializers,
+)
+from drf_utils.serializers import (
+    CachedFieldsMixin,
+    CompiledRepresentationMixin,
+    DynamicFieldsModelSerializer,
+    EagerLoadingMixin,
+)
+from rest_framework.serializers import (
+    CharField,
+    DateField,
+    IntegerField,
+    ModelSerializer,
+    Serializer,
+    SerializerMethodField,
+    ValidationError,
+)
 
 
 class AppTest(TestCase):
@@ -99,6 +136,76 @@ class AppTest(TestCase):
         profile.refresh_from_db()
         self.assertEqual(profile.birth_date, dt.date(2023, 2, 17))
 
+    def test_nested_strategy_with_foreign_key_skips_unchanged(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        address = Address.objects.create(
+            city="city",
+            state="state",
+            street="street",
+            number="number",
+            neighborhood="neighborhood",
+            profile=profile,
+        )
+
+        new_data = {
+            "id": address.id,
+            "city": "new city",
+            "state": "state",
+            "street": "street",
+            "number": "number",
+            "neighborhood": "neighborhood",
+            "profile": {"id": profile.id, "birth_date": "2023-02-16"},
+        }
+        address_serializer = AddressWithProfileSerializer(address, data=new_data)
+        address_serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as context:
+            address_serializer.save()
+
+        self.assertFalse(
+            any(
+                query["sql"].startswith('UPDATE "app_profile"')
+                for query in context.captured_queries
+            )
+        )
+        address.refresh_from_db()
+        self.assertEqual(address.city, "new city")
+        self.assertEqual(address.profile_id, profile.id)
+
+    def test_nested_strategy_with_foreign_key_does_not_reload_saved_objects(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        address = Address.objects.create(
+            city="city",
+            state="state",
+            street="street",
+            number="number",
+            neighborhood="neighborhood",
+            profile=profile,
+        )
+
+        new_data = {
+            "id": address.id,
+            "city": "new city",
+            "state": "state",
+            "street": "street",
+            "number": "number",
+            "neighborhood": "neighborhood",
+            "profile": {"id": profile.id, "birth_date": "2023-02-17"},
+        }
+        address_serializer = AddressWithProfileSerializer(address, data=new_data)
+        address_serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as context:
+            address_serializer.save()
+            data = address_serializer.data
+
+        # Profile update and address update, the saved objects are rendered
+        # from memory
+        self.assertEqual(
+            [query["sql"].split()[0] for query in context.captured_queries],
+            ["SAVEPOINT", "UPDATE", "UPDATE", "RELEASE"],
+        )
+        self.assertEqual(data["city"], "new city")
+        self.assertEqual(data["profile"]["birth_date"], "2023-02-17")
+
     def test_nested_strategy_with_reverse_foreign_key(self):
         # Setup
         profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
@@ -234,6 +341,370 @@ class AppTest(TestCase):
         with self.assertRaises(Address.DoesNotExist):
             address.refresh_from_db()
 
+    def test_nested_strategy_with_reverse_foreign_key_removes_all_stale(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        for i in range(3):
+            Address.objects.create(
+                city=f"city {i}",
+                state="state",
+                street="street",
+                number="number",
+                neighborhood="neighborhood",
+                profile=profile,
+            )
+
+        new_data = {"birth_date": "2023-02-16", "addresses": []}
+        profile_serializer = ProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        profile_serializer.save()
+
+        self.assertEqual(profile.addresses.count(), 0)
+        self.assertEqual(Address.objects.count(), 0)
+
+    def test_nested_strategy_with_reverse_foreign_key_loads_children_once(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        addresses = [
+            Address.objects.create(
+                city=f"city {i}",
+                state="state",
+                street="street",
+                number="number",
+                neighborhood="neighborhood",
+                profile=profile,
+            )
+            for i in range(3)
+        ]
+
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                {
+                    "id": address.id,
+                    "city": f"new city {i}",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                }
+                for i, address in enumerate(addresses)
+            ],
+        }
+        profile_serializer = ProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        # savepoint, parent update, one select for all children, delete,
+        # one update per child, release savepoint
+        with self.assertNumQueries(5 + len(addresses)):
+            profile_serializer.save()
+
+        self.assertEqual(
+            sorted(profile.addresses.values_list("city", flat=True)),
+            ["new city 0", "new city 1", "new city 2"],
+        )
+
+    def test_nested_strategy_with_reverse_foreign_key_prefetched(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        kept, removed = [
+            Address.objects.create(
+                city=f"city {i}",
+                state="state",
+                street="street",
+                number="number",
+                neighborhood="neighborhood",
+                profile=profile,
+            )
+            for i in range(2)
+        ]
+        profile = ProfileSerializer.prefetch_queryset(Profile.objects.all()).get()
+
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                {
+                    "id": kept.id,
+                    "city": "new city",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                }
+            ],
+        }
+        profile_serializer = ProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        # savepoint, parent update, delete, child update, release savepoint
+        with self.assertNumQueries(5):
+            profile_serializer.save()
+
+        self.assertFalse(Address.objects.filter(id=removed.id).exists())
+        addresses = profile_serializer.data["addresses"]
+        self.assertEqual(len(addresses), 1)
+        self.assertEqual(addresses[0]["city"], "new city")
+
+    def test_nested_strategy_with_reverse_foreign_key_skips_unchanged(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        address = Address.objects.create(
+            city="city",
+            state="state",
+            street="street",
+            number="number",
+            neighborhood="neighborhood",
+            profile=profile,
+        )
+
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                {
+                    "id": address.id,
+                    "city": "city",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                }
+            ],
+        }
+        profile_serializer = ProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as context:
+            profile_serializer.save()
+
+        self.assertFalse(
+            any(
+                query["sql"].startswith('UPDATE "app_address"')
+                for query in context.captured_queries
+            )
+        )
+        self.assertEqual(profile.addresses.get().id, address.id)
+
+    def test_nested_strategy_with_reverse_foreign_key_renders_saved_children(self):
+        @save_nested_serializers(["addresses"])
+        class NoHookProfileSerializer(ModelSerializer):
+            addresses = AddressSerializer(many=True)
+
+            class Meta:
+                model = Profile
+                fields = ("id", "birth_date", "addresses")
+
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        address = Address.objects.create(
+            city="city",
+            state="state",
+            street="street",
+            number="number",
+            neighborhood="neighborhood",
+            profile=profile,
+        )
+
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                {
+                    "city": "created city",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                },
+                {
+                    "id": address.id,
+                    "city": "new city",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                },
+            ],
+        }
+        profile_serializer = NoHookProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        profile_serializer.save()
+
+        # The saved addresses are rendered without querying them again
+        with self.assertNumQueries(0):
+            addresses = profile_serializer.data["addresses"]
+        self.assertEqual(
+            addresses, ProfileSerializer(Profile.objects.get()).data["addresses"]
+        )
+        self.assertEqual(
+            [item["city"] for item in addresses], ["new city", "created city"]
+        )
+
+    def test_nested_strategy_with_reverse_foreign_key_hook_adds_child(self):
+        @save_nested_serializers(["addresses"])
+        class HookProfileSerializer(ModelSerializer):
+            addresses = AddressSerializer(many=True)
+
+            class Meta:
+                model = Profile
+                fields = ("id", "birth_date", "addresses")
+
+            def post_save_nested_serializers(self, instance, is_created):
+                Address.objects.create(
+                    city="hook",
+                    state="state",
+                    street="street",
+                    number="number",
+                    neighborhood="neighborhood",
+                    profile=instance,
+                )
+                return instance
+
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                {
+                    "city": "city",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                }
+            ],
+        }
+        profile_serializer = HookProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        profile_serializer.save()
+
+        # The address created by the hook is rendered as well
+        addresses = profile_serializer.data["addresses"]
+        self.assertEqual([item["city"] for item in addresses], ["city", "hook"])
+
+    def test_nested_strategy_with_reverse_foreign_key_malformed_id(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        address = Address.objects.create(
+            city="city",
+            state="state",
+            street="street",
+            number="number",
+            neighborhood="neighborhood",
+            profile=profile,
+        )
+
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                {
+                    "id": "abc",
+                    "city": "created city",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                }
+            ],
+        }
+        profile_serializer = ProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        profile_serializer.save()
+
+        # The item with a malformed id is created as a new address
+        self.assertFalse(Address.objects.filter(id=address.id).exists())
+        self.assertEqual(
+            list(Address.objects.values_list("city", flat=True)), ["created city"]
+        )
+
+    def test_nested_strategy_resolves_only_present_fields(self):
+        @save_nested_serializers(["addresses", "nickname"])
+        class NicknameProfileSerializer(ModelSerializer):
+            addresses = AddressSerializer(many=True, required=False)
+            nickname = CharField(required=False)
+
+            class Meta:
+                model = Profile
+                fields = ("id", "birth_date", "addresses", "nickname")
+
+        # "nickname" is not a model field, which only matters when it is sent
+        profile_serializer = NicknameProfileSerializer(
+            data={"birth_date": "2023-02-16", "addresses": []}
+        )
+        profile_serializer.is_valid(raise_exception=True)
+        profile_serializer.save()
+        self.assertTrue(Profile.objects.exists())
+
+        profile_serializer = NicknameProfileSerializer(
+            data={"birth_date": "2023-02-16", "nickname": "nickname"}
+        )
+        profile_serializer.is_valid(raise_exception=True)
+        with self.assertRaises(FieldDoesNotExist):
+            profile_serializer.save()
+
+    def test_nested_strategy_with_reverse_foreign_key_custom_update(self):
+        class ChangedOnlyListSerializer(NestedListSerializer):
+            def update(self, instance, validated_data):
+                super().update(instance, validated_data)
+                return []
+
+        class CustomAddressSerializer(AddressSerializer):
+            class Meta(AddressSerializer.Meta):
+                list_serializer_class = ChangedOnlyListSerializer
+
+        @save_nested_serializers(["addresses"])
+        class CustomProfileSerializer(ModelSerializer):
+            addresses = CustomAddressSerializer(many=True)
+
+            class Meta:
+                model = Profile
+                fields = ("id", "birth_date", "addresses")
+
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                {
+                    "city": "city",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                }
+            ],
+        }
+        profile_serializer = CustomProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        profile_serializer.save()
+
+        # What the custom update() returns is not treated as the children
+        addresses = profile_serializer.data["addresses"]
+        self.assertEqual([item["city"] for item in addresses], ["city"])
+
+    def test_nested_strategy_with_reverse_foreign_key_saves_reuploaded_files(self):
+        class DocumentSerializer(ModelSerializer):
+            class Meta:
+                model = Document
+                fields = ("id", "file")
+                list_serializer_class = NestedListSerializer
+
+        @save_nested_serializers(["documents"])
+        class ProfileWithDocumentsSerializer(ModelSerializer):
+            documents = DocumentSerializer(many=True)
+
+            class Meta:
+                model = Profile
+                fields = ("id", "birth_date", "documents")
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root
+        ):
+            profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+            document = Document.objects.create(profile=profile)
+            document.file.save("a.txt", ContentFile(b"old"))
+
+            new_data = {
+                "birth_date": "2023-02-16",
+                "documents": [
+                    {"id": document.id, "file": SimpleUploadedFile("a.txt", b"new")}
+                ],
+            }
+            profile_serializer = ProfileWithDocumentsSerializer(profile, data=new_data)
+            profile_serializer.is_valid(raise_exception=True)
+            profile_serializer.save()
+
+            document.refresh_from_db()
+            with document.file.open("rb") as file:
+                self.assertEqual(file.read(), b"new")
+
     def test_nested_strategy_with_one_to_one_field(self):
         author1 = Author.objects.create(name="author1")
 
@@ -339,6 +810,41 @@ class AppTest(TestCase):
         with self.assertRaises(Profile.DoesNotExist):
             profile.refresh_from_db()
 
+    def test_nested_strategy_with_one_to_one_field_saves_reuploaded_files(self):
+        class DocumentSerializer(ModelSerializer):
+            class Meta:
+                model = Document
+                fields = ("id", "file")
+
+        @save_nested_serializers(["document"])
+        class ContractSerializer(ModelSerializer):
+            document = DocumentSerializer()
+
+            class Meta:
+                model = Contract
+                fields = ("id", "document")
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root
+        ):
+            document = Document.objects.create()
+            document.file.save("a.txt", ContentFile(b"old"))
+            contract = Contract.objects.create(document=document)
+
+            new_data = {
+                "document": {
+                    "id": document.id,
+                    "file": SimpleUploadedFile("a.txt", b"new"),
+                }
+            }
+            contract_serializer = ContractSerializer(contract, data=new_data)
+            contract_serializer.is_valid(raise_exception=True)
+            contract_serializer.save()
+
+            document.refresh_from_db()
+            with document.file.open("rb") as file:
+                self.assertEqual(file.read(), b"new")
+
     def test_nested_strategy_with_reverse_one_to_one_field(self):
         author1 = Author.objects.create(name="author1")
         profile = Profile.objects.create(birth_date=dt.date(2020, 2, 16))
@@ -461,6 +967,102 @@ class AppTest(TestCase):
         self.assertEqual(category1.name, "category1")
         self.assertEqual(category2.name, "category2")
 
+    def test_nested_strategy_keeps_outer_transaction_usable(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                {
+                    "city": "city",
+                    "state": "state",
+                    "street": "street",
+                    "number": "number",
+                    "neighborhood": "neighborhood",
+                }
+            ],
+        }
+        profile_serializer = ProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        with mock.patch.object(
+            ProfileSerializer,
+            "post_save_nested_serializers",
+            side_effect=RuntimeError,
+        ):
+            with self.assertRaises(RuntimeError):
+                profile_serializer.save()
+
+        # Only the savepoint was rolled back
+        self.assertFalse(Address.objects.exists())
+        self.assertTrue(Profile.objects.filter(id=profile.id).exists())
+
+    def test_nested_strategy_hook_is_atomic_without_nested_data(self):
+        profile_serializer = ProfileSerializer(
+            data={"birth_date": "2023-02-16"}, partial=True
+        )
+        profile_serializer.is_valid(raise_exception=True)
+        self.assertNotIn("addresses", profile_serializer.validated_data)
+        with mock.patch.object(
+            ProfileSerializer,
+            "post_save_nested_serializers",
+            side_effect=RuntimeError,
+        ):
+            with self.assertRaises(RuntimeError):
+                profile_serializer.save()
+
+        # The created profile was rolled back along with the hook
+        self.assertFalse(Profile.objects.exists())
+
+    def test_nested_strategy_without_savepoint(self):
+        @save_nested_serializers(["addresses"], savepoint=False)
+        class NoSavepointProfileSerializer(ModelSerializer):
+            addresses = AddressSerializer(many=True)
+
+            class Meta:
+                model = Profile
+                fields = ("id", "birth_date", "addresses")
+
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        new_data = {"birth_date": "2023-02-17", "addresses": []}
+        profile_serializer = NoSavepointProfileSerializer(profile, data=new_data)
+        profile_serializer.is_valid(raise_exception=True)
+        # parent update, delete
+        with self.assertNumQueries(2):
+            profile_serializer.save()
+
+    def test_choice_strategy_with_locked_instance(self):
+        @save_nested_choice_serializers(["category"], lock_instance=True)
+        class LockedBookSerializer(ModelSerializer):
+            category = NestedRelationChoiceField(
+                allow_null=False,
+                serializer_class=CategorySerializer,
+            )
+
+            class Meta:
+                model = Book
+                fields = (
+                    "id",
+                    "title",
+                    "category",
+                )
+
+        category1 = Category.objects.create(name="category1")
+        category2 = Category.objects.create(name="category2")
+        book = Book.objects.create(title="book1", category=category1)
+
+        # Another request changes the book after it was loaded
+        Book.objects.filter(id=book.id).update(title="changed elsewhere")
+
+        new_data = {"category": {"id": category2.id, "name": category2.name}}
+        book_serializer = LockedBookSerializer(book, data=new_data, partial=True)
+        book_serializer.is_valid(raise_exception=True)
+        saved_book = book_serializer.save()
+
+        # The instance was re-fetched, so the concurrent change is kept
+        book.refresh_from_db()
+        self.assertEqual(saved_book.title, "changed elsewhere")
+        self.assertEqual(book.title, "changed elsewhere")
+        self.assertEqual(book.category_id, category2.id)
+
     def test_choice_strategy_with_many_to_many_field(self):
         author1 = Author.objects.create(name="author1")
         author2 = Author.objects.create(name="author2")
@@ -523,6 +1125,64 @@ class AppTest(TestCase):
         self.assertEqual(author1.name, "author1")
         self.assertEqual(author2.name, "author2")
 
+    def test_choice_strategy_with_many_to_many_field_fetches_authors_once(self):
+        authors = [Author.objects.create(name=f"author{i}") for i in range(3)]
+        category = Category.objects.create(name="category")
+        book = Book.objects.create(title="book", category=category)
+
+        new_data = {
+            "id": book.id,
+            "title": "book",
+            "authors": [
+                {"id": str(author.id), "name": author.name} for author in authors
+            ],
+        }
+        book_serializer = BookWithAuthorsSerializer(book, data=new_data)
+        with self.assertNumQueries(1):
+            book_serializer.is_valid(raise_exception=True)
+        self.assertEqual(book_serializer.validated_data["authors"], authors)
+
+        new_data["authors"].append({"id": 0, "name": "missing"})
+        book_serializer = BookWithAuthorsSerializer(book, data=new_data)
+        self.assertFalse(book_serializer.is_valid())
+        self.assertEqual(book_serializer.errors["authors"], ["Invalid choice: 0"])
+
+    def test_choice_strategy_with_list_fetches_choices_once(self):
+        categories = [Category.objects.create(name=f"category{i}") for i in range(3)]
+        authors = [Author.objects.create(name=f"author{i}") for i in range(2)]
+
+        data = [
+            {"title": f"book{i}", "category": {"id": category.id}}
+            for i, category in enumerate(categories)
+        ]
+        book_serializer = BookSerializer(data=data, many=True)
+        with self.assertNumQueries(1):
+            book_serializer.is_valid(raise_exception=True)
+        self.assertEqual(
+            [item["category"] for item in book_serializer.validated_data], categories
+        )
+
+        data = [
+            {"title": "book", "authors": [{"id": author.id} for author in authors]},
+            {"title": "book", "authors": [{"id": authors[0].id}]},
+        ]
+        book_serializer = BookWithAuthorsSerializer(data=data, many=True)
+        with self.assertNumQueries(1):
+            book_serializer.is_valid(raise_exception=True)
+        self.assertEqual(book_serializer.validated_data[0]["authors"], authors)
+
+        data = [{"title": "book", "category": {"id": 0}}]
+        book_serializer = BookSerializer(data=data, many=True)
+        self.assertFalse(book_serializer.is_valid())
+        self.assertEqual(book_serializer.errors[0]["category"], ["Invalid choice: 0"])
+
+    def test_choice_strategy_with_list_keeps_meta_untouched(self):
+        book_serializer = BookSerializer(data=[], many=True)
+        self.assertIsInstance(book_serializer, NestedChoiceListSerializer)
+        self.assertIsInstance(book_serializer.child, BookSerializer)
+        self.assertIs(book_serializer.child.parent, book_serializer)
+        self.assertFalse(hasattr(BookSerializer.Meta, "list_serializer_class"))
+
     def test_choice_strategy_with_custom_queryset(self):
         @save_nested_choice_serializers(["category"])
         class CustomBookSerializer(ModelSerializer):
@@ -658,3 +1318,512 @@ class AppTest(TestCase):
             json.dumps(book_serializer.errors),
             '{"category": ["Invalid choice: 3"]}',
         )
+
+
+class Base64FileFieldTest(TestCase):
+    def test_decode_string(self):
+        field = Base64FileField()
+        file = field.to_internal_value({"data": "data:text/plain;base64,aGVsbG8="})
+        self.assertEqual(file.read(), b"hello")
+        self.assertTrue(file.name.endswith(".txt"))
+
+    def test_decode_bytes(self):
+        field = Base64FileField()
+        file = field.to_internal_value(
+            {"data": b"data:text/plain;base64,aGVsbG8=", "name": "hello.txt"}
+        )
+        self.assertEqual(file.read(), b"hello")
+        self.assertEqual(file.name, "hello.txt")
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=4)
+    def test_decode_large_file_to_temporary_file(self):
+        field = Base64FileField()
+        with mock.patch("drf_utils.fields._DECODE_CHUNK_SIZE", 8):
+            file = field.to_internal_value(
+                {"data": "data:text/plain;base64,aGVsbG8gd29ybGQh"}
+            )
+            self.assertIsInstance(file, TemporaryUploadedFile)
+            self.assertEqual(file.read(), b"hello world!")
+            self.assertEqual(file.size, 12)
+            file.close()
+
+            # Line breaks shift the chunk boundaries
+            file = field.to_internal_value(
+                {"data": "data:text/plain;base64,aGVsbG8g\nd29ybGQh"}
+            )
+            self.assertEqual(file.read(), b"hello world!")
+            file.close()
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=4)
+    def test_decode_large_file_closes_temporary_file_on_error(self):
+        field = Base64FileField()
+        close = TemporaryUploadedFile.close
+        with mock.patch("drf_utils.fields._DECODE_CHUNK_SIZE", 8), mock.patch.object(
+            TemporaryUploadedFile, "close", autospec=True, side_effect=close
+        ) as close_mock:
+            with self.assertRaises(binascii.Error):
+                field.to_internal_value(
+                    {"data": "data:text/plain;base64,aGVsbG8gd29ybGQ"}
+                )
+        close_mock.assert_called_once()
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=4)
+    def test_decode_large_file_with_non_ascii_characters(self):
+        field = Base64FileField()
+        close = TemporaryUploadedFile.close
+        with mock.patch.object(
+            TemporaryUploadedFile, "close", autospec=True, side_effect=close
+        ) as close_mock:
+            with self.assertRaisesMessage(ValueError, "invalid file"):
+                field.to_internal_value({"data": "data:text/plain;base64,aGVsbG8é"})
+        close_mock.assert_called_once()
+
+    def test_invalid_header(self):
+        field = Base64FileField()
+        with self.assertRaises(ValueError):
+            field.to_internal_value({"data": "aGVsbG8="})
+
+
+class ISODateFieldTest(TestCase):
+    def test_parse(self):
+        field = ISODateField()
+        self.assertEqual(field.to_internal_value("2023-02-16"), dt.date(2023, 2, 16))
+        self.assertEqual(
+            field.to_internal_value(dt.date(2023, 2, 16)), dt.date(2023, 2, 16)
+        )
+        # Invalid values fail exactly like a regular DateField
+        for value in ("2023-02-30", "2023/02/16", "16-02-2023", 20230216):
+            with self.subTest(value=value):
+                with self.assertRaises(ValidationError) as expected:
+                    DateField().to_internal_value(value)
+                with self.assertRaises(ValidationError) as context:
+                    field.to_internal_value(value)
+                self.assertEqual(context.exception.detail, expected.exception.detail)
+
+    def test_custom_input_formats(self):
+        field = ISODateField(input_formats=["%Y-%d-%m"])
+        self.assertEqual(field.to_internal_value("2023-16-02"), dt.date(2023, 2, 16))
+        self.assertEqual(field.to_internal_value("2023-01-02"), dt.date(2023, 2, 1))
+
+
+class WritableSerializerMethodFieldTest(TestCase):
+    def test_get_and_save_methods(self):
+        class NameSerializer(Serializer):
+            name = WritableSerializerMethodField()
+
+            def get_name(self, instance):
+                return instance["name"].upper()
+
+            def save_name(self, data):
+                return data.lower()
+
+        serializer = NameSerializer({"name": "john"})
+        self.assertEqual(serializer.data, {"name": "JOHN"})
+
+        serializer = NameSerializer(data={"name": "JOHN"})
+        serializer.is_valid(raise_exception=True)
+        self.assertEqual(serializer.validated_data, {"name": "john"})
+
+
+class DynamicFieldsModelSerializerTest(TestCase):
+    def setUp(self):
+        class DynamicAddressSerializer(DynamicFieldsModelSerializer):
+            class Meta:
+                model = Address
+                fields = ("id", "city")
+
+        class DynamicAuthorSerializer(DynamicFieldsModelSerializer):
+            class Meta:
+                model = Author
+                fields = ("id", "name", "books")
+
+        class DynamicProfileSerializer(DynamicFieldsModelSerializer):
+            addresses = DynamicAddressSerializer(many=True)
+            author = DynamicAuthorSerializer()
+
+            class Meta:
+                model = Profile
+                fields = ("id", "birth_date", "addresses", "author")
+
+        self.serializer_class = DynamicProfileSerializer
+
+    def test_setup_eager_loading(self):
+        queryset = self.serializer_class.setup_eager_loading(Profile.objects.all())
+        self.assertEqual(queryset.query.select_related, {"author": {}})
+        self.assertEqual(
+            queryset._prefetch_related_lookups, ("addresses", "author__books")
+        )
+
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        Author.objects.create(name="author", profile=profile)
+        with self.assertNumQueries(3):
+            data = self.serializer_class(queryset, many=True).data
+        self.assertEqual(data[0]["author"]["name"], "author")
+
+    def test_setup_eager_loading_with_selected_fields(self):
+        queryset = self.serializer_class.setup_eager_loading(
+            Profile.objects.all(), fields=["id", "addresses"]
+        )
+        self.assertFalse(queryset.query.select_related)
+        self.assertEqual(queryset._prefetch_related_lookups, ("addresses",))
+
+        queryset = self.serializer_class.setup_eager_loading(
+            Profile.objects.all(), exclude=["addresses"]
+        )
+        self.assertEqual(queryset.query.select_related, {"author": {}})
+        self.assertEqual(queryset._prefetch_related_lookups, ("author__books",))
+
+    def test_select_adjacent_nested_fields(self):
+        serializer = self.serializer_class(
+            fields=["id", {"addresses": ["city"]}, {"author": ["name"]}],
+            exclude=["id", {"author": ["id"]}],
+        )
+        self.assertEqual(list(serializer.fields), ["addresses", "author"])
+        self.assertEqual(list(serializer.fields["addresses"].child.fields), ["city"])
+        self.assertEqual(list(serializer.fields["author"].fields), ["name"])
+
+
+class EagerLoadingMixinTest(TestCase):
+    def test_prefetch_queryset(self):
+        cases = [
+            (AddressWithProfileSerializer, Address, {"profile": {}}, ()),
+            (ProfileSerializer, Profile, {}, ("addresses",)),
+            (ProfileWithAuthorSerializer, Profile, {"author": {}}, ("addresses",)),
+            (BookSerializer, Book, {"category": {}}, ()),
+            (BookWithAuthorsSerializer, Book, {}, ("authors",)),
+            (
+                AuthorWithProfileSerializer,
+                Author,
+                {"profile": {}},
+                ("profile__addresses",),
+            ),
+        ]
+        for serializer_class, model, select_related, prefetch_related in cases:
+            with self.subTest(serializer_class=serializer_class.__name__):
+                queryset = serializer_class.prefetch_queryset(model.objects.all())
+                self.assertEqual(queryset.query.select_related or {}, select_related)
+                self.assertEqual(queryset._prefetch_related_lookups, prefetch_related)
+
+    def test_prefetch_queryset_avoids_n_plus_one(self):
+        category = Category.objects.create(name="category")
+        for i in range(3):
+            book = Book.objects.create(title=f"book {i}", category=category)
+            book.authors.add(Author.objects.create(name=f"author {i}"))
+
+        queryset = BookWithAuthorsSerializer.prefetch_queryset(Book.objects.all())
+        with self.assertNumQueries(2):
+            data = BookWithAuthorsSerializer(queryset, many=True).data
+        self.assertEqual(len(data), 3)
+
+        queryset = BookSerializer.prefetch_queryset(Book.objects.all())
+        with self.assertNumQueries(1):
+            data = BookSerializer(queryset, many=True).data
+        self.assertEqual(data[0]["category"]["name"], "category")
+
+    def test_only_serialized_fields(self):
+        class ProfileWithAgeSerializer(EagerLoadingMixin, ModelSerializer):
+            age = SerializerMethodField()
+
+            class Meta:
+                model = Profile
+                fields = ("id", "age")
+
+            def get_age(self, instance):
+                return dt.date.today().year - instance.birth_date.year
+
+        book_fields = ["id", "title", "category", "category__id", "category__name"]
+        cases = [
+            (BookSerializer, book_fields),
+            (
+                ProfileWithAuthorSerializer,
+                ["id", "birth_date", "author__id", "author__name"],
+            ),
+            (
+                AddressWithProfileSerializer,
+                ["id", "city", "state", "street", "number", "neighborhood"]
+                + ["profile", "profile__id", "profile__birth_date"],
+            ),
+            # The columns read by get_age() are unknown
+            (ProfileWithAgeSerializer, None),
+        ]
+        for serializer_class, only_fields in cases:
+            with self.subTest(serializer_class=serializer_class.__name__):
+                self.assertEqual(serializer_class().get_only_fields(), only_fields)
+
+        category = Category.objects.create(name="category")
+        Book.objects.create(title="book", category=category)
+        queryset = BookSerializer.prefetch_queryset(
+            Book.objects.all(), only_serialized_fields=True
+        )
+        only_fields, _ = queryset.query.deferred_loading
+        self.assertEqual(sorted(only_fields), sorted(book_fields))
+        with self.assertNumQueries(1):
+            data = BookSerializer(queryset, many=True).data
+        self.assertEqual(data[0]["title"], "book")
+        self.assertEqual(data[0]["category"]["name"], "category")
+
+
+class LazyImportTest(TestCase):
+    def test_serializers_do_not_import_nesting_utils(self):
+        code = (
+            "import sys, django; django.setup(); import drf_utils.serializers; "
+            "assert 'drf_utils.nesting.utils' not in sys.modules; "
+            "from drf_utils.nesting import NestedListSerializer; "
+            "assert 'drf_utils.nesting.utils' in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+
+class CachedFieldsMixinTest(TestCase):
+    def test_fields_are_built_once_per_class(self):
+        class CachedAddressSerializer(CachedFieldsMixin, ModelSerializer):
+            class Meta:
+                model = Address
+                fields = ("id", "city")
+
+        class CachedAddressWithStateSerializer(CachedAddressSerializer):
+            class Meta:
+                model = Address
+                fields = ("id", "city", "state")
+
+        with mock.patch.object(
+            ModelSerializer,
+            "get_fields",
+            autospec=True,
+            side_effect=ModelSerializer.get_fields,
+        ) as get_fields:
+            first = CachedAddressSerializer()
+            second = CachedAddressSerializer()
+            self.assertEqual(list(first.fields), ["id", "city"])
+            self.assertEqual(list(second.fields), ["id", "city"])
+            self.assertEqual(get_fields.call_count, 1)
+
+            subclass = CachedAddressWithStateSerializer()
+            self.assertEqual(list(subclass.fields), ["id", "city", "state"])
+            self.assertEqual(get_fields.call_count, 2)
+
+        # Every instance gets its own field objects
+        self.assertIsNot(first.fields["city"], second.fields["city"])
+        self.assertIs(first.fields["city"].parent, first)
+        self.assertIs(second.fields["city"].parent, second)
+
+
+class CompiledRepresentationMixinTest(TestCase):
+    def test_matches_model_serializer(self):
+        profile = Profile.objects.create(birth_date=dt.date(1990, 1, 2))
+        Address.objects.create(profile=profile, city="city", number="10")
+        Author.objects.create(name="author", profile=profile)
+
+        data = ProfileWithAuthorSerializer(profile).data
+        self.assertEqual(data["birth_date"], "1990-01-02")
+        self.assertEqual(data["addresses"][0]["number"], "10")
+        self.assertEqual(data["author"]["name"], "author")
+
+        # Same output as DRF's own implementation
+        for serializer in (
+            ProfileWithAuthorSerializer(profile),
+            AddressWithProfileSerializer(profile.addresses.first()),
+        ):
+            with self.subTest(serializer=type(serializer).__name__):
+                expected = ModelSerializer.to_representation(
+                    serializer, serializer.instance
+                )
+                self.assertEqual(serializer.data, expected)
+
+    def test_nested_list_uses_representation_plan(self):
+        profile = Profile.objects.create(birth_date=dt.date(1990, 1, 2))
+        addresses = [
+            Address.objects.create(profile=profile, city=f"city {i}") for i in range(3)
+        ]
+
+        data = ProfileSerializer(profile).data["addresses"]
+        self.assertEqual(data, [AddressSerializer(a).data for a in addresses])
+
+        class UpperCityAddressSerializer(AddressSerializer):
+            def to_representation(self, instance):
+                ret = super().to_representation(instance)
+                ret["city"] = ret["city"].upper()
+                return ret
+
+        data = UpperCityAddressSerializer(profile.addresses.all(), many=True).data
+        self.assertEqual(
+            [item["city"] for item in data], ["CITY 0", "CITY 1", "CITY 2"]
+        )
+
+    def test_deduplicated_fields(self):
+        profile = Profile.objects.create(birth_date=dt.date(1990, 1, 2))
+        for i in range(3):
+            Address.objects.create(
+                profile=profile, city=f"city {i}", state="state", street="street"
+            )
+
+        data = ProfileSerializer(profile).data["addresses"]
+        self.assertEqual([item["state"] for item in data], ["state"] * 3)
+        self.assertIs(data[0]["state"], data[2]["state"])
+        # Fields that are not listed are left as they are
+        self.assertIsNot(data[0]["street"], data[2]["street"])
+
+    def test_falls_back_for_callables_mappings_and_dotted_sources(self):
+        class ProfileInfoSerializer(CompiledRepresentationMixin, Serializer):
+            id = IntegerField()
+            birth_date = CharField(source="birth_date.year")
+            address_count = IntegerField(source="addresses.count")
+
+        profile = Profile.objects.create(birth_date=dt.date(1990, 1, 2))
+        Address.objects.create(profile=profile, city="city")
+
+        self.assertEqual(
+            ProfileInfoSerializer(profile).data,
+            {"id": profile.id, "birth_date": "1990", "address_count": 1},
+        )
+
+        class ItemSerializer(CompiledRepresentationMixin, Serializer):
+            id = IntegerField()
+            items = IntegerField()
+
+        # Mapping keys shadowed by dict methods are still looked up as keys
+        self.assertEqual(
+            ItemSerializer({"id": 1, "items": 2}).data, {"id": 1, "items": 2}
+        )
+
+        class EncodingSerializer(CompiledRepresentationMixin, Serializer):
+            encoding = CharField()
+
+        # Mapping keys shadowed by attributes are still looked up as keys
+        self.assertEqual(
+            EncodingSerializer(QueryDict("encoding=latin")).data, {"encoding": "latin"}
+        )
+
+
+class BulkNestedListSerializerTest(TestCase):
+    def setUp(self):
+        class BulkNestedListSerializer(NestedListSerializer):
+            bulk_save_threshold = 2
+
+        class BulkAddressSerializer(ModelSerializer):
+            class Meta:
+                model = Address
+                fields = ("id", "city", "state", "street", "number", "neighborhood")
+                list_serializer_class = BulkNestedListSerializer
+
+        @save_nested_serializers(["addresses"])
+        class BulkProfileSerializer(ModelSerializer):
+            addresses = BulkAddressSerializer(many=True)
+
+            class Meta:
+                model = Profile
+                fields = ("id", "birth_date", "addresses")
+
+        self.serializer_class = BulkProfileSerializer
+        self.list_serializer_class = BulkNestedListSerializer
+
+    def _address_data(self, city, **kwargs):
+        return {
+            "city": city,
+            "state": "state",
+            "street": "street",
+            "number": "number",
+            "neighborhood": "neighborhood",
+            **kwargs,
+        }
+
+    def test_bulk_create_update_and_delete(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        kept = Address.objects.create(profile=profile, **self._address_data("kept"))
+        removed = Address.objects.create(
+            profile=profile, **self._address_data("removed")
+        )
+
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                self._address_data("updated", id=kept.id),
+                self._address_data("created 1"),
+                self._address_data("created 2"),
+            ],
+        }
+        serializer = self.serializer_class(profile, data=new_data)
+        serializer.is_valid(raise_exception=True)
+        with self.assertNumQueries(7):
+            # savepoint, parent update, in_bulk, delete, bulk_create,
+            # bulk_update, release savepoint
+            serializer.save()
+
+        kept.refresh_from_db()
+        self.assertEqual(kept.city, "updated")
+        self.assertEqual(kept.profile_id, profile.id)
+        self.assertFalse(Address.objects.filter(id=removed.id).exists())
+        self.assertEqual(
+            sorted(profile.addresses.values_list("city", flat=True)),
+            ["created 1", "created 2", "updated"],
+        )
+
+    def test_bulk_update_only_writes_changed_fields(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        addresses = [
+            Address.objects.create(profile=profile, **self._address_data(f"city {i}"))
+            for i in range(2)
+        ]
+
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                self._address_data(f"new city {i}", id=address.id)
+                for i, address in enumerate(addresses)
+            ],
+        }
+        serializer = self.serializer_class(profile, data=new_data)
+        serializer.is_valid(raise_exception=True)
+        with CaptureQueriesContext(connection) as context:
+            serializer.save()
+
+        updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "app_address"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"city"', updates[0])
+        self.assertNotIn('"state"', updates[0])
+        self.assertEqual(
+            sorted(profile.addresses.values_list("city", flat=True)),
+            ["new city 0", "new city 1"],
+        )
+
+    @skipUnlessDBFeature("supports_update_conflicts_with_target")
+    def test_bulk_upsert(self):
+        profile = Profile.objects.create(birth_date=dt.date(2023, 2, 16))
+        kept = Address.objects.create(profile=profile, **self._address_data("kept"))
+
+        new_data = {
+            "birth_date": "2023-02-16",
+            "addresses": [
+                self._address_data("updated", id=kept.id),
+                self._address_data("created 1"),
+                self._address_data("created 2"),
+            ],
+        }
+        serializer = self.serializer_class(profile, data=new_data)
+        serializer.is_valid(raise_exception=True)
+        with mock.patch.object(self.list_serializer_class, "bulk_upsert", True):
+            with CaptureQueriesContext(connection) as context:
+                serializer.save()
+
+        address_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"app_address"' in query["sql"]
+            and not query["sql"].startswith(("SELECT", "DELETE"))
+        ]
+        self.assertTrue(address_queries)
+        self.assertTrue(all("ON CONFLICT" in sql for sql in address_queries))
+        self.assertFalse(
+            any(sql.startswith('UPDATE "app_address"') for sql in address_queries)
+        )
+        kept.refresh_from_db()
+        self.assertEqual(kept.city, "updated")
+        self.assertEqual(kept.profile_id, profile.id)
+        self.assertEqual(
+            sorted(profile.addresses.values_list("city", flat=True)),
+            ["created 1", "created 2", "updated"],
+        )